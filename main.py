@@ -115,6 +115,8 @@ class PaperTradingPlugin(Star):
         try:
             # 停止挂单监控
             await self.order_monitor.stop_monitoring()
+            # 关闭行情API连接
+            await self.stock_service.close()
             logger.info("A股模拟交易插件已停止")
         except Exception as e:
             logger.error(f"插件停止时出错: {e}")
@@ -160,7 +162,7 @@ class PaperTradingPlugin(Star):
                     logger.error(f"更新用户 {user_id} 数据失败: {e}")
             
             # 清理过期的市场数据缓存
-            self.storage.clear_market_cache()
+            self.stock_service.clear_cache()
             
             logger.info("每日维护任务完成")
         except Exception as e:
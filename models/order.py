@@ -1,5 +1,5 @@
 """订单数据模型"""
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from typing import Dict, Any, Optional
 from enum import Enum
 import time
@@ -26,7 +26,7 @@ class PriceType(Enum):
     LIMIT = "limit"      # 限价
 
 
-@dataclass
+@dataclass(slots=True)
 class Order:
     """订单模型"""
     order_id: str                   # 订单ID
@@ -58,7 +58,7 @@ class Order:
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
-        data = asdict(self)
+        data = {name: getattr(self, name) for name in self.__dataclass_fields__}
         # 转换枚举为字符串
         data['order_type'] = self.order_type.value
         data['price_type'] = self.price_type.value
@@ -67,7 +67,8 @@ class Order:
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Order':
-        """从字典创建订单对象"""
+        """从字典创建订单对象（忽略未知字段，不修改传入的字典）"""
+        data = {name: data[name] for name in cls.__dataclass_fields__ if name in data}
         # 转换字符串为枚举
         if isinstance(data.get('order_type'), str):
             data['order_type'] = OrderType(data['order_type'])
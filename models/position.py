@@ -1,10 +1,10 @@
 """持仓数据模型"""
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from typing import Dict, Any
 import time
 
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     """持仓模型"""
     user_id: str                    # 用户ID
@@ -27,13 +27,13 @@ class Position:
             self.update_time = int(time.time())
     
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return asdict(self)
+        """转换为字典（字段均为基本类型，无需asdict深拷贝）"""
+        return {name: getattr(self, name) for name in self.__dataclass_fields__}
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Position':
-        """从字典创建持仓对象"""
-        return cls(**data)
+        """从字典创建持仓对象（忽略未知字段）"""
+        return cls(**{name: data[name] for name in cls.__dataclass_fields__ if name in data})
     
     def add_position(self, volume: int, price: float):
         """增加持仓"""
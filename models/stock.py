@@ -5,6 +5,27 @@ from typing import Dict, Any, Optional
 import time
 
 
+# 原始行情数据缺失字段时使用的默认值
+_RAW_FIELD_DEFAULTS = {
+    'code': '',
+    'name': '',
+    'current_price': 0,
+    'open_price': 0,
+    'close_price': 0,
+    'high_price': 0,
+    'low_price': 0,
+    'volume': 0,
+    'turnover': 0,
+    'bid1_price': 0,
+    'ask1_price': 0,
+    'change_percent': 0,
+    'change_amount': 0,
+    'limit_up': 0,
+    'limit_down': 0,
+    'is_suspended': False,
+}
+
+
 @dataclass
 class StockInfo:
     """股票信息模型"""
@@ -41,6 +62,12 @@ class StockInfo:
         """从字典创建股票信息对象"""
         return cls(**data)
     
+    @classmethod
+    def from_raw(cls, raw_data: Dict[str, Any], market: str = "A", update_time: int = 0) -> 'StockInfo':
+        """从API原始行情数据创建股票信息对象（忽略多余字段，缺失字段取默认值）"""
+        fields = {key: raw_data.get(key, default) for key, default in _RAW_FIELD_DEFAULTS.items()}
+        return cls(**fields, update_time=update_time, market=market)
+    
     def is_limit_up(self) -> bool:
         """是否涨停"""
         # 使用math.isclose进行更精确的浮点数比较
@@ -1,10 +1,10 @@
 """用户数据模型"""
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from typing import Dict, Any
 import time
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     """用户模型"""
     user_id: str                    # 用户ID
@@ -22,13 +22,13 @@ class User:
             self.last_login = int(time.time())
     
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return asdict(self)
+        """转换为字典（字段均为基本类型，无需asdict深拷贝）"""
+        return {name: getattr(self, name) for name in self.__dataclass_fields__}
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'User':
-        """从字典创建用户对象"""
-        return cls(**data)
+        """从字典创建用户对象（忽略未知字段）"""
+        return cls(**{name: data[name] for name in cls.__dataclass_fields__ if name in data})
     
     def update_login_time(self):
         """更新登录时间"""
@@ -41,24 +41,34 @@ class EastMoneyAPIService:
             '中小板': '0.399005'
         }
     
-    async def __aenter__(self):
-        """异步上下文管理器入口"""
+    async def initialize(self) -> 'EastMoneyAPIService':
+        """初始化HTTP会话（会话已打开时直接复用，保持长连接）"""
         if aiohttp is None:
             raise ImportError("需要安装aiohttp: pip install aiohttp")
         
-        connector = aiohttp.TCPConnector(verify_ssl=False)
-        timeout = aiohttp.ClientTimeout(total=30)
-        self.session = aiohttp.ClientSession(
-            connector=connector,
-            timeout=timeout,
-            headers=self.headers
-        )
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(verify_ssl=False)
+            timeout = aiohttp.ClientTimeout(total=30)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                headers=self.headers
+            )
         return self
     
+    async def close(self):
+        """关闭HTTP会话"""
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+    
+    async def __aenter__(self):
+        """异步上下文管理器入口"""
+        return await self.initialize()
+    
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """异步上下文管理器出口"""
-        if self.session:
-            await self.session.close()
+        await self.close()
     
     async def get_code_id(self, code: str) -> Optional[Tuple[str, str]]:
         """
@@ -13,6 +13,8 @@ from .currency_service import get_currency_service
 class MarketRulesEngine:
     """A股市场规则引擎"""
 
+    __slots__ = ('storage', 'currency_service')
+
     def __init__(self, storage: DataStorage):
         self.storage = storage
         self.currency_service = get_currency_service(storage)  # 汇率服务
@@ -36,26 +38,30 @@ class MarketRulesEngine:
             logger.warning("[交易时间验证] 没有股票信息，使用默认A股验证")
             return market_time_manager.can_place_order()
     
-    def validate_buy_order(self, stock_info: StockInfo, order: Order, user_balance: float) -> Tuple[bool, str]:
-        """验证买入订单"""
+    def validate_buy_order(self, stock_info: StockInfo, order: Order, user_balance: float) -> Tuple[bool, str, float]:
+        """验证买入订单
+
+        Returns:
+            (是否通过, 错误信息, 按委托价计算的买入所需金额（人民币，未计算时为0）)
+        """
         # 1. 检查交易时间（限价单可以在任何时候下单）
         if order.is_market_order():
             # 市价单需要在交易时间内
             time_valid, time_msg = self.validate_trading_time(stock_info)
             if not time_valid:
-                return False, time_msg + "（市价单需要在交易时间内下单）"
+                return False, time_msg + "（市价单需要在交易时间内下单）", 0.0
 
         # 2. 检查股票是否停牌
         if stock_info.is_suspended:
-            return False, f"{stock_info.name}当前停牌，无法交易"
+            return False, f"{stock_info.name}当前停牌，无法交易", 0.0
 
         # 3. 检查涨跌停限制：涨停时不能买入
         if stock_info.is_limit_up():
-            return False, f"{stock_info.name}已涨停，无法买入"
+            return False, f"{stock_info.name}已涨停，无法买入", 0.0
 
         # 4. 检查价格是否超出涨跌停
         if not stock_info.can_buy_at_price(order.order_price):
-            return False, f"买入价格{order.order_price:.2f}超出涨停价{stock_info.limit_up:.2f}"
+            return False, f"买入价格{order.order_price:.2f}超出涨停价{stock_info.limit_up:.2f}", 0.0
 
         # 5. 检查资金是否充足（考虑汇率）
         total_amount_cny = self.calculate_buy_amount(order.order_volume, order.order_price, stock_info.market)
@@ -65,22 +71,22 @@ class MarketRulesEngine:
             formatted_needed = self.currency_service.format_currency(total_amount_cny, 'CNY')
             formatted_balance = self.currency_service.format_currency(user_balance, 'CNY')
             market_name = 'A股' if stock_info.market == 'A' else ('港股' if stock_info.market == 'HK' else '美股')
-            return False, f"资金不足，需要{formatted_needed}（{market_name}），可用余额{formatted_balance}"
+            return False, f"资金不足，需要{formatted_needed}（{market_name}），可用余额{formatted_balance}", total_amount_cny
 
         # 6. 检查最小交易单位（A股100股，港股美股1股）
         min_volume = 100 if stock_info.market == 'A' else 1
         if order.order_volume % min_volume != 0:
             market_unit = "100股" if stock_info.market == 'A' else "1股"
-            return False, f"交易数量必须是{min_volume}股的整数倍（{market_unit}）"
+            return False, f"交易数量必须是{min_volume}股的整数倍（{market_unit}）", total_amount_cny
 
         # 7. 检查最小交易金额
         min_amount = 100 if stock_info.market == 'A' else (1000 if stock_info.market == 'HK' else 100)
         if total_amount_cny < min_amount:
             market_name = 'A股' if stock_info.market == 'A' else ('港股' if stock_info.market == 'HK' else '美股')
             formatted_amount = self.currency_service.format_currency(min_amount, 'CNY')
-            return False, f"单笔交易金额不能少于{formatted_amount}（{market_name}）"
+            return False, f"单笔交易金额不能少于{formatted_amount}（{market_name}）", total_amount_cny
 
-        return True, ""
+        return True, "", total_amount_cny
     
     def validate_sell_order(self, stock_info: StockInfo, order: Order, position: Optional[Position]) -> Tuple[bool, str]:
         """验证卖出订单"""
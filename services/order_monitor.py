@@ -1,7 +1,7 @@
 """挂单监控服务"""
 import asyncio
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from astrbot.api import logger
 from astrbot.api.star import StarTools
 from astrbot.api.event import MessageEventResult
@@ -10,7 +10,7 @@ from ..models.user import User
 from ..models.position import Position
 from ..utils.data_storage import DataStorage
 from .stock_data import StockDataService
-from .trading_engine import TradingEngine
+from .trading_engine import TradingEngine, user_lock
 from .market_rules import MarketRulesEngine
 
 
@@ -262,21 +262,46 @@ class OrderMonitorService:
         logger.info(f"订单 {order.order_id} 达到成交条件，开始成交")
         
         try:
+            async with user_lock(order.user_id):
+                # 持锁后重新读取订单：等待行情期间订单可能已被撤销
+                order_data = self.storage.get_order(order.order_id)
+                if not order_data or not Order.from_dict(order_data).is_pending():
+                    logger.info(f"订单 {order.order_id} 已不是待成交状态，跳过成交")
+                    return
+
+                if order.is_buy_order():
+                    filled = self._fill_buy_order(order, stock_info)
+                else:
+                    filled = self._fill_sell_order(order, stock_info)
+
+            if not filled:
+                return
+
+            # 更新总资产（校正），需在释放用户账户锁后调用
+            await self.trading_engine.update_user_assets(order.user_id)
+
             if order.is_buy_order():
-                await self._fill_buy_order(order, stock_info)
+                logger.info(f"买单成交: {order.stock_name} {order.order_volume}股，价格{filled['fill_price']:.2f}元")
+                await self._send_fill_notification(order, filled['fill_price'], "买入")
             else:
-                await self._fill_sell_order(order, stock_info)
+                logger.info(f"卖单成交: {order.stock_name} {order.order_volume}股，价格{filled['fill_price']:.2f}元，"
+                            f"到账{filled['total_income']:.2f}元")
+                await self._send_fill_notification(order, filled['fill_price'], "卖出", filled['total_income'])
         
         except Exception as e:
             logger.info(f"订单成交失败: {e}")
     
-    async def _fill_buy_order(self, order: Order, stock_info):
-        """成交买单"""
+    def _fill_buy_order(self, order: Order, stock_info) -> Optional[Dict[str, Any]]:
+        """成交买单（同步读-改-写，调用方须持有用户账户锁）
+
+        Returns:
+            成交信息（fill_price），未成交时返回None
+        """
         # 获取用户信息
         user_data = self.storage.get_user(order.user_id)
         if not user_data:
             logger.info(f"用户 {order.user_id} 不存在")
-            return
+            return None
         
         user = User.from_dict(user_data)
         
@@ -326,21 +351,19 @@ class OrderMonitorService:
         self.storage.save_position(user.user_id, order.stock_code, position.to_dict())
         self.storage.save_order(order.order_id, order.to_dict())
 
-        # 更新总资产（校正）
-        await self.trading_engine.update_user_assets(user.user_id)
-
-        logger.info(f"买单成交: {order.stock_name} {order.order_volume}股，价格{fill_price:.2f}元")
-        
-        # 向用户推送成交通知
-        await self._send_fill_notification(order, fill_price, "买入")
+        return {'fill_price': fill_price}
     
-    async def _fill_sell_order(self, order: Order, stock_info):
-        """成交卖单"""
+    def _fill_sell_order(self, order: Order, stock_info) -> Optional[Dict[str, Any]]:
+        """成交卖单（同步读-改-写，调用方须持有用户账户锁）
+
+        Returns:
+            成交信息（fill_price、total_income），未成交时返回None
+        """
         # 获取用户信息
         user_data = self.storage.get_user(order.user_id)
         if not user_data:
             logger.info(f"用户 {order.user_id} 不存在")
-            return
+            return None
         
         user = User.from_dict(user_data)
         
@@ -350,7 +373,7 @@ class OrderMonitorService:
             logger.info(f"用户 {order.user_id} 没有股票 {order.stock_code} 的持仓")
             order.cancel_order()
             self.storage.save_order(order.order_id, order.to_dict())
-            return
+            return None
         
         position = Position.from_dict(position_data)
         
@@ -359,7 +382,7 @@ class OrderMonitorService:
             logger.info(f"用户 {order.user_id} 可卖数量不足")
             order.cancel_order()
             self.storage.save_order(order.order_id, order.to_dict())
-            return
+            return None
         
         # 确定成交价格（使用当前实时价格）
         fill_price = stock_info.current_price
@@ -391,13 +414,7 @@ class OrderMonitorService:
 
         self.storage.save_order(order.order_id, order.to_dict())
 
-        # 更新总资产（校正）
-        await self.trading_engine.update_user_assets(user.user_id)
-
-        logger.info(f"卖单成交: {order.stock_name} {order.order_volume}股，价格{fill_price:.2f}元，到账{total_income:.2f}元")
-        
-        # 向用户推送成交通知
-        await self._send_fill_notification(order, fill_price, "卖出", total_income)
+        return {'fill_price': fill_price, 'total_income': total_income}
     
     async def force_check_order(self, order_id: str) -> bool:
         """强制检查单个订单"""
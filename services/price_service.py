@@ -23,7 +23,8 @@ class PriceLimitService:
         self.storage = storage
     
     async def get_limit_prices(self, raw_api_data: Dict[str, Any], stock_code: str, 
-                             stock_name: str, current_time: Optional[datetime] = None) -> Tuple[float, float]:
+                             stock_name: str, current_time: Optional[datetime] = None,
+                             api=None) -> Tuple[float, float]:
         """
         获取涨跌停价格 - 统一入口
         
@@ -32,6 +33,7 @@ class PriceLimitService:
             stock_code: 股票代码
             stock_name: 股票名称
             current_time: 当前时间，默认为系统当前时间
+            api: 调用方已打开的东方财富API实例，传入时复用其会话
             
         Returns:
             (涨停价, 跌停价)
@@ -45,13 +47,13 @@ class PriceLimitService:
         
         if strategy == PriceStrategy.API_DIRECT:
             # 使用API返回的涨跌停价格
-            return await self._get_api_limit_prices(raw_api_data, stock_code, stock_name)
+            return await self._get_api_limit_prices(raw_api_data, stock_code, stock_name, api)
         else:
             # 基于收盘价本地计算涨跌停价格
-            return await self._calculate_local_limit_prices(raw_api_data, stock_code, stock_name, current_time)
+            return await self._calculate_local_limit_prices(raw_api_data, stock_code, stock_name, current_time, api)
     
     async def _get_api_limit_prices(self, raw_api_data: Dict[str, Any], 
-                                  stock_code: str, stock_name: str) -> Tuple[float, float]:
+                                  stock_code: str, stock_name: str, api=None) -> Tuple[float, float]:
         """
         从API数据中获取涨跌停价格
         
@@ -59,6 +61,7 @@ class PriceLimitService:
             raw_api_data: API返回的原始数据
             stock_code: 股票代码  
             stock_name: 股票名称
+            api: 调用方已打开的东方财富API实例
             
         Returns:
             (涨停价, 跌停价)
@@ -72,11 +75,12 @@ class PriceLimitService:
         else:
             # API数据无效，回退到本地计算
             logger.warning(f"API涨跌停价格无效，回退到本地计算: {stock_name}({stock_code})")
-            return await self._calculate_local_limit_prices(raw_api_data, stock_code, stock_name)
+            return await self._calculate_local_limit_prices(raw_api_data, stock_code, stock_name, api=api)
     
     async def _calculate_local_limit_prices(self, raw_api_data: Dict[str, Any], 
                                           stock_code: str, stock_name: str,
-                                          current_time: Optional[datetime] = None) -> Tuple[float, float]:
+                                          current_time: Optional[datetime] = None,
+                                          api=None) -> Tuple[float, float]:
         """
         基于收盘价本地计算涨跌停价格
         
@@ -85,6 +89,7 @@ class PriceLimitService:
             stock_code: 股票代码
             stock_name: 股票名称
             current_time: 当前时间
+            api: 调用方已打开的东方财富API实例，传入时复用其会话
             
         Returns:
             (涨停价, 跌停价)
@@ -94,7 +99,10 @@ class PriceLimitService:
             from ..utils.price_calculator import get_price_calculator
             price_calc = get_price_calculator(self.storage)
             
-            price_limits = await price_calc.calculate_price_limits(stock_code, stock_name, current_time)
+            # 原始行情中已有基准价（非交易时间current_price即最近收盘价），无需再次请求同一行情
+            base_price = raw_api_data.get('current_price', 0) or raw_api_data.get('close_price', 0)
+            price_limits = await price_calc.calculate_price_limits(stock_code, stock_name, current_time, api,
+                                                                   base_price=base_price)
             calculated_limit_up = price_limits.get('limit_up', 0)
             calculated_limit_down = price_limits.get('limit_down', 0)
             
@@ -137,7 +145,10 @@ class PriceLimitService:
             try:
                 from .stock_data import StockDataService
                 stock_service = StockDataService(self.storage)
-                stock_info = await stock_service.get_stock_info(stock_code, use_cache=False)
+                try:
+                    stock_info = await stock_service.get_stock_info(stock_code, use_cache=False)
+                finally:
+                    await stock_service.close()
                 
                 if stock_info:
                     return {
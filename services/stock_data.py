@@ -1,35 +1,127 @@
 """股票数据服务 - 支持A股、港股、美股"""
+import asyncio
+import functools
 import time
 import re
+from collections import OrderedDict
 from typing import Optional, Dict, Any
-from datetime import datetime, time as dt_time
+from datetime import datetime, timezone, time as dt_time
 from astrbot.api import logger
 
 from ..models.stock import StockInfo
 from ..utils.validators import Validators
 from ..utils.data_storage import DataStorage
-from ..utils.market_time import is_trading_time, is_call_auction_time, can_place_order
+from ..utils.market_time import (
+    is_trading_time, is_call_auction_time, can_place_order, is_order_time, get_next_trading_time
+)
 from .eastmoney_api import EastMoneyAPIService
 from .longport_api import LongPortAPIService
 
+# A股代码：6位数字（沪深北交所前缀）
+_A_CODE_RE = re.compile(r'^(?:00|30|60|68|43|83|87)\d{4}$')
+
+# 股票代码的市场后缀
+_MARKET_SUFFIXES = ('.HK', '.US', '.A')
+
+# 进程内行情缓存的最大条目数
+_MEM_CACHE_MAX = 4096
+
+# 批量构建A股信息时的最大并发数
+_BUILD_CONCURRENCY = 16
+
+
+def _match_market_suffix(code: str) -> Optional[str]:
+    """返回大写股票代码的市场后缀（'.HK', '.US', '.A'），没有后缀时返回None"""
+    return next((suffix for suffix in _MARKET_SUFFIXES if code.endswith(suffix)), None)
+
+
+@functools.lru_cache(maxsize=8192)
+def _parse_code(raw: str) -> tuple[str, str, Optional[str]]:
+    """
+    解析股票代码（纯函数，结果按代码缓存）
+
+    Args:
+        raw: 原始股票代码，可带市场后缀（如000001、000001.A、00700.HK、AAPL）
+
+    Returns:
+        (market, base_code, normalized_code)，market为'A', 'HK', 'US', 'UNKNOWN'，
+        base_code为去掉市场后缀的大写代码，无法标准化时normalized_code为None
+    """
+    code = raw.strip().upper()
+
+    # 检查是否已经是完整格式（带市场后缀）
+    suffix = _match_market_suffix(code)
+    if suffix:
+        market = suffix[1:]
+        base_code = code[:-len(suffix)]
+
+    # A股：6位数字
+    elif _A_CODE_RE.match(code):
+        market, base_code = 'A', code
+
+    # 港股：5位数字（通常）
+    elif code.isdigit() and 4 <= len(code) <= 5:
+        # 需要额外判断，但这里假设5位数字可能是港股
+        market, base_code = 'HK', code
+
+    # 美股：通常是大写字母，1-5个字符
+    elif code.isalpha() and 1 <= len(code) <= 5:
+        market, base_code = 'US', code
+
+    else:
+        return 'UNKNOWN', code, None
+
+    if market == 'A':
+        # A股使用东方财富API
+        return 'A', base_code, Validators.normalize_stock_code(base_code)
+
+    # 港股美股使用长桥API（如00700.HK、AAPL.US）
+    return market, base_code, f"{base_code}.{market}"
+
 
 class StockDataService:
     """股票数据服务 - 支持A股、港股、美股"""
 
     def __init__(self, storage: DataStorage):
         self.storage = storage
-        self._cache_ttl = 30  # 缓存30秒
+        self._cache_ttl = 30  # 默认缓存30秒（未知市场）
+        # 各市场缓存有效期（秒）：(可下单时段内, 休市)
+        # 可下单时段含集合竞价、盘前盘后及夜盘，这些时段订单也会按缓存价格成交
+        self._market_cache_ttl = {
+            'A': (3, 3600),
+            'HK': (3, 3600),
+            'US': (3, 3600)
+        }
+        # 缓存过期后仍可先返回旧数据、同时后台刷新的时长（秒）
+        self._stale_ttl = 30
         self.eastmoney_api = None
         self.longport_api = None
+        # 进程内LRU行情缓存，避免每次读取都加载持久化缓存文件
+        self._mem_cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        # 进行中的行情请求，相同股票的并发请求共享同一次上游调用
+        self._inflight: Dict[tuple, asyncio.Task] = {}
 
     async def _initialize_apis(self):
         """初始化API服务"""
-        if self.eastmoney_api is None:
-            self.eastmoney_api = EastMoneyAPIService(self.storage)
+        await self._get_eastmoney_api()
 
         if self.longport_api is None:
             self.longport_api = LongPortAPIService(self.storage)
             await self.longport_api.initialize()
+
+    async def _get_eastmoney_api(self) -> EastMoneyAPIService:
+        """获取东方财富API实例（复用同一HTTP会话）"""
+        if self.eastmoney_api is None:
+            self.eastmoney_api = EastMoneyAPIService(self.storage)
+        await self.eastmoney_api.initialize()
+        return self.eastmoney_api
+
+    async def close(self):
+        """关闭API连接"""
+        if self.eastmoney_api:
+            await self.eastmoney_api.close()
+        if self.longport_api:
+            await self.longport_api.close()
     
     def _detect_market(self, stock_code: str) -> str:
         """
@@ -41,31 +133,7 @@ class StockDataService:
         Returns:
             市场类型: 'A', 'HK', 'US', 'UNKNOWN'
         """
-        stock_code = stock_code.upper().strip()
-
-        # 检查是否已经是完整格式（带市场后缀）
-        if '.HK' in stock_code or '.US' in stock_code or '.A' in stock_code:
-            if '.HK' in stock_code:
-                return 'HK'
-            elif '.US' in stock_code:
-                return 'US'
-            else:
-                return 'A'
-
-        # A股：6位数字
-        if re.match(r'^(00|30|60|68|43|83|87)\d{4}$', stock_code):
-            return 'A'
-
-        # 港股：5位数字（通常）
-        if stock_code.isdigit() and 4 <= len(stock_code) <= 5:
-            # 需要额外判断，但这里假设5位数字可能是港股
-            return 'HK'
-
-        # 美股：通常是大写字母，1-5个字符
-        if stock_code.isalpha() and 1 <= len(stock_code) <= 5:
-            return 'US'
-
-        return 'UNKNOWN'
+        return _parse_code(stock_code)[0]
 
     def _normalize_stock_code(self, stock_code: str) -> tuple[str, Optional[str]]:
         """
@@ -77,31 +145,18 @@ class StockDataService:
         Returns:
             (market, normalized_code)
         """
-        market = self._detect_market(stock_code)
-
-        if market == 'A':
-            # A股使用东方财富API
-            normalized = Validators.normalize_stock_code(stock_code)
-            return 'A', normalized
+        market, _, normalized = _parse_code(stock_code)
+        return market, normalized
 
-        elif market == 'HK' or market == 'US':
-            # 港股美股使用长桥API
-            if '.' not in stock_code:
-                if market == 'HK':
-                    return 'HK', f"{stock_code}.HK"
-                elif market == 'US':
-                    return 'US', f"{stock_code}.US"
-            return market, stock_code
-
-        return market, None
-
-    async def get_stock_info(self, stock_code: str, use_cache: bool = True, skip_limit_calculation: bool = False) -> Optional[StockInfo]:
+    async def get_stock_info(self, stock_code: str, use_cache: bool = True, skip_limit_calculation: bool = False,
+                             allow_closed_cache: bool = True) -> Optional[StockInfo]:
         """
         获取股票实时信息
 
         Args:
             stock_code: 股票代码
             use_cache: 是否使用缓存
+            allow_closed_cache: 休市时是否直接使用收盘后的缓存（下单路径应传False，始终按有效期判断）
 
         Returns:
             股票信息对象或None
@@ -115,10 +170,55 @@ class StockDataService:
 
         # 检查缓存
         if use_cache:
-            cached_data = self.storage.get_market_cache(normalized_code)
-            if cached_data and self._is_cache_valid(cached_data):
-                return StockInfo.from_dict(cached_data)
+            cached_data = self._get_market_cache(normalized_code)
+            if cached_data:
+                # 休市且缓存之后没有交易过：缓存即最新收盘数据，无需请求
+                if self._is_cache_valid(cached_data, market) or (
+                        allow_closed_cache and self._is_closed_market_cache(cached_data, market)):
+                    return StockInfo.from_dict(cached_data)
+
+                # 刚过期的缓存：先返回旧数据，后台刷新（刷新失败时保留旧数据）
+                if self._is_cache_valid(cached_data, market, grace=self._stale_ttl):
+                    self._get_fetch_task(normalized_code, market, skip_limit_calculation)
+                    return StockInfo.from_dict(cached_data)
+
+        # shield：单个调用方被取消时不影响其他等待者
+        return await asyncio.shield(self._get_fetch_task(normalized_code, market, skip_limit_calculation))
+
+    def _get_fetch_task(self, normalized_code: str, market: str,
+                        skip_limit_calculation: bool = False) -> asyncio.Task:
+        """
+        获取进行中的行情请求，不存在时发起新请求（合并并发的重复请求）
 
+        Args:
+            normalized_code: 标准化后的股票代码
+            market: 市场类型
+            skip_limit_calculation: 是否跳过涨跌停计算
+
+        Returns:
+            行情请求任务
+        """
+        inflight_key = (normalized_code, skip_limit_calculation)
+        task = self._inflight.get(inflight_key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_stock_info(normalized_code, market, skip_limit_calculation))
+            self._inflight[inflight_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(inflight_key, None))
+        return task
+
+    async def _fetch_stock_info(self, normalized_code: str, market: str,
+                                skip_limit_calculation: bool = False) -> Optional[StockInfo]:
+        """
+        从上游API获取股票信息并写入缓存
+
+        Args:
+            normalized_code: 标准化后的股票代码
+            market: 市场类型
+            skip_limit_calculation: 是否跳过涨跌停计算
+
+        Returns:
+            股票信息对象或None
+        """
         # 根据市场选择API
         try:
             if market == 'A':
@@ -133,7 +233,7 @@ class StockDataService:
 
             if stock_data:
                 # 保存到缓存
-                self.storage.save_market_cache(normalized_code, stock_data.to_dict())
+                self._save_market_cache(normalized_code, stock_data.to_dict())
                 return stock_data
                 
         except Exception as e:
@@ -161,37 +261,16 @@ class StockDataService:
 
             raw_data = await self.longport_api.get_stock_quote(stock_code)
 
-            if not raw_data:
-                logger.warning(f"未获取到股票数据: {stock_code}")
-                return None
-
-            # 构建StockInfo对象
-            stock_info = StockInfo(
-                code=raw_data.get('code', ''),
-                name=raw_data.get('name', ''),
-                current_price=raw_data.get('current_price', 0),
-                open_price=raw_data.get('open_price', 0),
-                close_price=raw_data.get('close_price', 0),
-                high_price=raw_data.get('high_price', 0),
-                low_price=raw_data.get('low_price', 0),
-                volume=raw_data.get('volume', 0),
-                turnover=raw_data.get('turnover', 0),
-                bid1_price=raw_data.get('bid1_price', 0),
-                ask1_price=raw_data.get('ask1_price', 0),
-                change_percent=raw_data.get('change_percent', 0),
-                change_amount=raw_data.get('change_amount', 0),
-                limit_up=raw_data.get('limit_up', 0),
-                limit_down=raw_data.get('limit_down', 0),
-                is_suspended=raw_data.get('is_suspended', False),
-                update_time=int(time.time()),
-                market=market  # 添加市场类型
-            )
-
-            return stock_info
-
         except Exception as e:
             logger.error(f"从长桥API获取数据失败 {stock_code}: {e}")
             return None
+
+        if not raw_data or 'code' not in raw_data:
+            logger.warning(f"未获取到股票数据: {stock_code}")
+            return None
+
+        # 构建StockInfo对象
+        return StockInfo.from_raw(raw_data, market)
     
     async def _fetch_stock_data_from_eastmoney(self, stock_code: str, skip_limit_calculation: bool = False, market: str = 'A') -> Optional[StockInfo]:
         """
@@ -206,21 +285,23 @@ class StockDataService:
             股票信息对象或None
         """
         try:
-            async with EastMoneyAPIService(self.storage) as api:
-                raw_data = await api.get_stock_realtime_data(stock_code)
+            api = await self._get_eastmoney_api()
+            raw_data = await api.get_stock_realtime_data(stock_code)
 
-                if not raw_data:
-                    logger.warning(f"未获取到股票数据: {stock_code}")
-                    return None
+            if not raw_data:
+                logger.warning(f"未获取到股票数据: {stock_code}")
+                return None
 
-                # 构造StockInfo对象
-                return await self._build_stock_info(raw_data, skip_limit_calculation, market)
+            # 构造StockInfo对象
+            return await self._build_stock_info(raw_data, skip_limit_calculation, market, api=api)
                 
         except Exception as e:
             logger.error(f"从东方财富API获取数据失败 {stock_code}: {e}")
             return None
     
-    async def _build_stock_info(self, raw_data: Dict[str, Any], skip_limit_calculation: bool = False, market: str = 'A') -> StockInfo:
+    async def _build_stock_info(self, raw_data: Dict[str, Any], skip_limit_calculation: bool = False, market: str = 'A',
+                                update_time: Optional[int] = None, trading_now: Optional[bool] = None,
+                                api: Optional[EastMoneyAPIService] = None) -> StockInfo:
         """
         从原始数据构建StockInfo对象
 
@@ -228,6 +309,9 @@ class StockDataService:
             raw_data: API返回的原始数据
             skip_limit_calculation: 是否跳过涨跌停计算
             market: 市场类型 ('A', 'HK', 'US')
+            update_time: 更新时间戳，默认为当前时间（批量构建时由调用方统一传入）
+            trading_now: 当前是否为交易时间，默认实时判断（批量构建时由调用方统一传入）
+            api: 已打开的东方财富API实例，涨跌停计算需要行情时复用其会话
 
         Returns:
             StockInfo对象
@@ -242,7 +326,7 @@ class StockDataService:
         trade_price = current_price if current_price > 0 else close_price
 
         # 检查股票是否停牌
-        is_suspended = self._check_if_suspended(raw_data)
+        is_suspended = self._check_if_suspended(raw_data, trading_now)
 
         # 获取涨跌停价格
         if skip_limit_calculation:
@@ -252,7 +336,7 @@ class StockDataService:
         else:
             from .price_service import get_price_limit_service
             price_service = get_price_limit_service(self.storage)
-            limit_up, limit_down = await price_service.get_limit_prices(raw_data, stock_code, stock_name)
+            limit_up, limit_down = await price_service.get_limit_prices(raw_data, stock_code, stock_name, api=api)
 
         # 构建StockInfo对象
         stock_info = StockInfo(
@@ -272,18 +356,19 @@ class StockDataService:
             limit_up=limit_up,
             limit_down=limit_down,
             is_suspended=is_suspended,
-            update_time=int(time.time()),
+            update_time=update_time if update_time is not None else int(time.time()),
             market=market  # 添加市场类型
         )
 
         return stock_info
     
-    def _check_if_suspended(self, raw_data: Dict[str, Any]) -> bool:
+    def _check_if_suspended(self, raw_data: Dict[str, Any], trading_now: Optional[bool] = None) -> bool:
         """
         检查股票是否停牌
         
         Args:
             raw_data: 原始数据
+            trading_now: 当前是否为交易时间，默认实时判断
             
         Returns:
             是否停牌
@@ -298,17 +383,123 @@ class StockDataService:
             return True
         
         # 如果在交易时间内，成交量为0且价格没有变化，可能是停牌
-        if is_trading_time():
+        if trading_now is None:
+            trading_now = is_trading_time()
+        if trading_now:
             return volume == 0 and change_percent == 0
         
         return False
     
-    def _is_cache_valid(self, cache_data: Dict) -> bool:
+    def _get_market_cache(self, stock_code: str) -> Optional[Dict[str, Any]]:
+        """
+        读取行情缓存（优先进程内缓存，未命中时读取持久化缓存）
+
+        Args:
+            stock_code: 标准化后的股票代码
+
+        Returns:
+            缓存数据或None
+        """
+        cached_data = self._mem_cache.get(stock_code)
+        if cached_data is not None:
+            self._mem_cache.move_to_end(stock_code)
+            return cached_data
+
+        cached_data = self.storage.get_market_cache(stock_code)
+        if cached_data:
+            self._remember_market_cache(stock_code, cached_data)
+        return cached_data
+
+    def _save_market_cache(self, stock_code: str, market_data: Dict[str, Any]):
+        """
+        写入行情缓存（同时更新进程内缓存和持久化缓存）
+
+        Args:
+            stock_code: 标准化后的股票代码
+            market_data: 行情数据
+        """
+        self._remember_market_cache(stock_code, market_data)
+        self.storage.save_market_cache(stock_code, market_data)
+
+    def _save_market_cache_bulk(self, updates: Dict[str, Dict[str, Any]]):
+        """
+        批量写入行情缓存，持久化缓存只写一次
+
+        Args:
+            updates: {标准化股票代码: 行情数据} 字典
+        """
+        for stock_code, market_data in updates.items():
+            self._remember_market_cache(stock_code, market_data)
+        self.storage.save_market_cache_bulk(updates)
+
+    def _remember_market_cache(self, stock_code: str, market_data: Dict[str, Any]):
+        """写入进程内缓存，超出容量时淘汰最久未使用的条目"""
+        self._mem_cache[stock_code] = market_data
+        self._mem_cache.move_to_end(stock_code)
+        if len(self._mem_cache) > _MEM_CACHE_MAX:
+            self._mem_cache.popitem(last=False)
+
+    def clear_cache(self):
+        """清空行情缓存"""
+        self._mem_cache.clear()
+        self.storage.clear_market_cache()
+
+    def _get_cache_ttl(self, market: Optional[str] = None, orderable_now: Optional[bool] = None) -> int:
+        """
+        获取缓存有效期：可下单时段内短TTL保证实时性，休市时长TTL减少无效请求
+
+        Args:
+            market: 市场类型（'A', 'HK', 'US'）
+            orderable_now: 当前是否可下单（含集合竞价、盘前盘后、夜盘），None时自行判断
+
+        Returns:
+            缓存有效期（秒）
+        """
+        ttl = self._market_cache_ttl.get(market)
+        if ttl is None:
+            return self._cache_ttl
+
+        if orderable_now is None:
+            orderable_now = is_order_time(None, market)
+        open_ttl, closed_ttl = ttl
+        return open_ttl if orderable_now else closed_ttl
+
+    def _is_closed_market_cache(self, cache_data: Dict, market: str) -> bool:
+        """
+        检查缓存在休市期间是否仍是最新数据（缓存写入后市场未再开盘）
+
+        以能否下单判断休市：集合竞价、盘前盘后、夜盘期间订单会按行情成交，不视为休市
+
+        Args:
+            cache_data: 缓存数据
+            market: 市场类型
+
+        Returns:
+            缓存是否可直接使用
+        """
+        if market not in self._market_cache_ttl:
+            return False
+
+        now = datetime.now(timezone.utc)
+        if is_order_time(now, market):
+            return False
+
+        # 可下单时段内写入的缓存不是收盘数据
+        cache_time = datetime.fromtimestamp(cache_data.get('update_time', 0), timezone.utc)
+        if is_order_time(cache_time, market):
+            return False
+
+        next_open = get_next_trading_time(now, market)
+        return next_open is not None and get_next_trading_time(cache_time, market) == next_open
+
+    def _is_cache_valid(self, cache_data: Dict, market: Optional[str] = None, grace: int = 0) -> bool:
         """
         检查缓存是否有效
         
         Args:
             cache_data: 缓存数据
+            market: 市场类型，默认取缓存数据中的市场
+            grace: 在缓存有效期之外额外允许的秒数
             
         Returns:
             缓存是否有效
@@ -319,7 +510,10 @@ class StockDataService:
         current_time = int(time.time())
         cache_time = cache_data['update_time']
         
-        return (current_time - cache_time) <= self._cache_ttl
+        if market is None:
+            market = cache_data.get('market')
+        
+        return (current_time - cache_time) <= self._get_cache_ttl(market) + grace
     
     def is_trading_time(self) -> bool:
         """
@@ -366,17 +560,15 @@ class StockDataService:
         """
         try:
             keyword_upper = keyword.upper().strip()
+            _, base_code, _ = _parse_code(keyword)
 
-            # 如果 keyword 包含市场后缀，进行精确搜索
-            if '.HK' in keyword_upper or '.US' in keyword_upper:
+            # 如果 keyword 包含市场后缀（如000001.A、00700.HK），进行精确搜索
+            if base_code != keyword_upper:
                 return await self._search_exact_market_stock(keyword)
-            elif '.' in keyword_upper and '.A' in keyword_upper:
-                # A股的完整格式（如000001.A）
-                base_code = keyword_upper.replace('.A', '')
-                return await self._search_exact_market_stock(base_code)
             else:
-                # 没有后缀，进行模糊搜索
-                return await self._search_fuzzy_stock(keyword)
+                # 其他关键词（如600000、700、TSLA、名称）：各市场并发，按A股、港股、美股优先级取结果
+                # A股代码在长桥模糊搜索中可能命中同号港股，由优先级保证A股结果优先
+                return await self.search_all_markets(keyword)
 
         except Exception as e:
             logger.error(f"搜索股票失败: {e}")
@@ -392,94 +584,96 @@ class StockDataService:
         Returns:
             股票列表
         """
-        keyword_upper = keyword.upper().strip()
+        market, base_code, normalized_code = _parse_code(keyword)
 
         try:
-            # 港股精确搜索
-            if '.HK' in keyword_upper:
-                stock_code = keyword_upper.replace('.HK', '')
-                await self._initialize_apis()
-                if self.longport_api and self.longport_api._initialized:
-                    # 标准化为长桥格式
-                    normalized_code = f"{stock_code}.HK"
-                    stock_data = await self.longport_api.get_stock_quote(normalized_code)
-                    if stock_data:
-                        return [{
-                            'code': stock_data['code'],
-                            'name': stock_data['name'],
-                            'price': stock_data['current_price'],
-                            'market': '港股'
-                        }]
-                return []
-
-            # 美股精确搜索
-            elif '.US' in keyword_upper:
-                stock_code = keyword_upper.replace('.US', '')
+            # 港股美股精确搜索
+            if market == 'HK' or market == 'US':
                 await self._initialize_apis()
                 if self.longport_api and self.longport_api._initialized:
-                    # 标准化为长桥格式
-                    normalized_code = f"{stock_code}.US"
+                    # 标准化为长桥格式（如00700.HK、AAPL.US）
                     stock_data = await self.longport_api.get_stock_quote(normalized_code)
                     if stock_data:
                         return [{
                             'code': stock_data['code'],
                             'name': stock_data['name'],
                             'price': stock_data['current_price'],
-                            'market': '美股'
+                            'market': '港股' if market == 'HK' else '美股'
                         }]
                 return []
 
             # A股精确搜索（不带后缀或带.A后缀）
             else:
-                async with EastMoneyAPIService(self.storage) as api:
-                    stock_info = await api.get_stock_realtime_data(keyword)
-                    if stock_info:
-                        return [{
-                            'code': stock_info['code'],
-                            'name': stock_info['name'],
-                            'price': stock_info['current_price'],
-                            'market': 'A股'
-                        }]
-                return []
+                return await self._search_a_stock_exact(base_code)
 
         except Exception as e:
             logger.error(f"精确搜索股票失败 {keyword}: {e}")
             return []
 
-    async def _search_fuzzy_stock(self, keyword: str) -> list:
+    async def search_all_markets(self, keyword: str) -> list:
         """
-        模糊搜索股票（不带市场后缀的情况）
+        并发搜索A股和港股美股，等待全部返回后按固定优先级（A股、港股、美股）取非空结果
+
+        结果不随各市场接口的返回先后变化，同名或双重上市的股票总是解析到同一市场
 
         Args:
-            keyword: 搜索关键词
+            keyword: 搜索关键词（不带市场后缀）
 
         Returns:
             股票列表
         """
         try:
-            # 首先尝试A股搜索
-            async with EastMoneyAPIService(self.storage) as api:
-                stock_info = await api.get_stock_realtime_data(keyword)
-                if stock_info:
-                    return [{
-                        'code': stock_info['code'],
-                        'name': stock_info['name'],
-                        'price': stock_info['current_price'],
-                        'market': 'A股'
-                    }]
-
-            # 如果A股搜索失败，尝试港股美股模糊搜索
             await self._initialize_apis()
+            # 任务按市场优先级排列；长桥模糊搜索同时覆盖港股和美股，结果中港股排在美股之前
+            tasks = [self._search_a_stock_exact(keyword)]
             if self.longport_api and self.longport_api._initialized:
-                hk_us_results = await self.longport_api.search_stocks_fuzzy(keyword, limit=5)
-                if hk_us_results:
-                    return hk_us_results
+                tasks.append(self.longport_api.search_stocks_fuzzy(keyword, limit=5))
 
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        except Exception as e:
+            logger.error(f"搜索股票失败: {e}")
             return []
 
-        except Exception as e:
-            logger.error(f"模糊搜索股票失败: {e}")
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"市场搜索失败 {keyword}: {result}")
+            elif result:
+                return result
+        return []
+
+    async def _search_a_stock_exact(self, keyword: str) -> list:
+        """
+        按代码精确查询A股
+
+        Args:
+            keyword: 股票代码
+
+        Returns:
+            股票列表（未找到时为空）
+        """
+        api = await self._get_eastmoney_api()
+        stock_info = await api.get_stock_realtime_data(keyword)
+        if not stock_info:
             return []
+        return [{
+            'code': stock_info['code'],
+            'name': stock_info['name'],
+            'price': stock_info['current_price'],
+            'market': 'A股'
+        }]
+
+    async def _search_a_stocks_fuzzy(self, keyword: str) -> list:
+        """
+        模糊搜索A股
+
+        Args:
+            keyword: 搜索关键词
+
+        Returns:
+            A股候选列表
+        """
+        api = await self._get_eastmoney_api()
+        return await api.search_stocks_fuzzy(keyword)
 
     async def search_stocks_fuzzy(self, keyword: str) -> list:
         """
@@ -494,16 +688,18 @@ class StockDataService:
         results = []
 
         try:
-            # 搜索A股
-            async with EastMoneyAPIService(self.storage) as api:
-                a_stock_results = await api.search_stocks_fuzzy(keyword)
-                results.extend(a_stock_results)
-
-            # 搜索港股美股
             await self._initialize_apis()
+
+            # A股与港股美股搜索并发进行
+            search_tasks = [self._search_a_stocks_fuzzy(keyword)]
             if self.longport_api and self.longport_api._initialized:
-                hk_us_results = await self.longport_api.search_stocks_fuzzy(keyword, limit=5)
-                results.extend(hk_us_results)
+                search_tasks.append(self.longport_api.search_stocks_fuzzy(keyword, limit=5))
+
+            for market_results in await asyncio.gather(*search_tasks, return_exceptions=True):
+                if isinstance(market_results, Exception):
+                    logger.error(f"模糊搜索股票失败: {market_results}")
+                elif market_results:
+                    results.extend(market_results)
 
             return results
 
@@ -523,85 +719,115 @@ class StockDataService:
         """
         results = {}
 
-        # 按市场分组股票代码
+        # 按市场分组股票代码（港股美股保留标准化结果，避免重复标准化）
         a_stock_codes = []
-        hk_us_stock_codes = []
+        hk_us_pairs = []
 
         for code in stock_codes:
             market, normalized = self._normalize_stock_code(code)
             if market == 'A' and normalized:
                 a_stock_codes.append(code)
             elif market in ['HK', 'US'] and normalized:
-                hk_us_stock_codes.append(code)
+                hk_us_pairs.append((code, normalized))
 
-        try:
-            # 批量获取A股数据
-            if a_stock_codes:
-                async with EastMoneyAPIService(self.storage) as api:
-                    raw_data_dict = await api.batch_get_stocks_data(a_stock_codes)
+        # A股与港股美股走不同的上游API，并发获取
+        batch_results = await asyncio.gather(
+            self._fetch_a_batch(a_stock_codes),
+            self._fetch_hkus_batch(hk_us_pairs),
+            return_exceptions=True
+        )
 
-                    for code, raw_data in raw_data_dict.items():
-                        try:
-                            stock_info = await self._build_stock_info(raw_data, skip_limit_calculation=False)
-                            results[code] = stock_info
+        for batch_result in batch_results:
+            if isinstance(batch_result, Exception):
+                logger.error(f"批量获取股票数据失败: {batch_result}")
+            else:
+                results.update(batch_result)
 
-                            # 保存到缓存
-                            self.storage.save_market_cache(code, stock_info.to_dict())
+        return results
 
-                        except Exception as e:
-                            logger.error(f"构建A股信息失败 {code}: {e}")
-                            results[code] = None
+    async def _fetch_a_batch(self, codes: list) -> Dict[str, Optional[StockInfo]]:
+        """
+        批量获取A股数据
 
-            # 批量获取港股美股数据
-            if hk_us_stock_codes:
-                await self._initialize_apis()
-                if self.longport_api and self.longport_api._initialized:
-                    # 标准化股票代码，过滤掉无效代码
-                    normalized_list = [self._normalize_stock_code(code) for code in hk_us_stock_codes]
-                    normalized_codes = [normalized_code for _, normalized_code in normalized_list if normalized_code is not None]
-
-                    if normalized_codes:
-                        raw_data_dict = await self.longport_api.get_multiple_quotes(normalized_codes)
-
-                        # 创建映射表，从标准化代码映射回原始代码
-                        code_mapping = {normalized: original for original, normalized in normalized_list if normalized is not None}
-
-                        for normalized_code, raw_data in raw_data_dict.items():
-                            original_code = code_mapping.get(normalized_code, normalized_code)
-                            try:
-                                if raw_data:
-                                    stock_info = StockInfo(
-                                        code=raw_data.get('code', ''),
-                                        name=raw_data.get('name', ''),
-                                        current_price=raw_data.get('current_price', 0),
-                                        open_price=raw_data.get('open_price', 0),
-                                        close_price=raw_data.get('close_price', 0),
-                                        high_price=raw_data.get('high_price', 0),
-                                        low_price=raw_data.get('low_price', 0),
-                                        volume=raw_data.get('volume', 0),
-                                        turnover=raw_data.get('turnover', 0),
-                                        bid1_price=raw_data.get('bid1_price', 0),
-                                        ask1_price=raw_data.get('ask1_price', 0),
-                                        change_percent=raw_data.get('change_percent', 0),
-                                        change_amount=raw_data.get('change_amount', 0),
-                                        limit_up=raw_data.get('limit_up', 0),
-                                        limit_down=raw_data.get('limit_down', 0),
-                                        is_suspended=raw_data.get('is_suspended', False),
-                                        update_time=int(time.time())
-                                    )
-                                    results[original_code] = stock_info
-
-                                    # 保存到缓存
-                                    self.storage.save_market_cache(normalized_code, stock_info.to_dict())
-                                else:
-                                    results[original_code] = None
-
-                            except Exception as e:
-                                logger.error(f"构建港股美股信息失败 {original_code}: {e}")
-                                results[original_code] = None
+        Args:
+            codes: A股代码列表
 
-        except Exception as e:
-            logger.error(f"批量获取股票数据失败: {e}")
+        Returns:
+            {原始代码: StockInfo} 字典
+        """
+        if not codes:
+            return {}
+
+        results = {}
+        api = await self._get_eastmoney_api()
+        raw_data_dict = await api.batch_get_stocks_data(codes)
+
+        now_ts = int(time.time())
+        trading_now = is_trading_time()
+        semaphore = asyncio.Semaphore(_BUILD_CONCURRENCY)
+
+        async def build(raw_data: Dict[str, Any]) -> StockInfo:
+            async with semaphore:
+                return await self._build_stock_info(raw_data, skip_limit_calculation=False,
+                                                    update_time=now_ts, trading_now=trading_now, api=api)
+
+        # 涨跌停价查询并发进行，限制并发数以免触发上游限流
+        built = await asyncio.gather(*(build(raw_data) for raw_data in raw_data_dict.values()),
+                                     return_exceptions=True)
+
+        updates = {}
+        for code, stock_info in zip(raw_data_dict.keys(), built):
+            if isinstance(stock_info, Exception):
+                logger.error(f"构建A股信息失败 {code}: {stock_info}")
+                results[code] = None
+                continue
+
+            results[code] = stock_info
+            updates[code] = stock_info.to_dict()
+
+        # 整批写入缓存
+        self._save_market_cache_bulk(updates)
+
+        return results
+
+    async def _fetch_hkus_batch(self, code_pairs: list) -> Dict[str, Optional[StockInfo]]:
+        """
+        批量获取港股美股数据
+
+        Args:
+            code_pairs: [(原始代码, 标准化代码)] 列表
+
+        Returns:
+            {原始代码: StockInfo} 字典
+        """
+        if not code_pairs:
+            return {}
+
+        results = {}
+        await self._initialize_apis()
+        if not self.longport_api or not self.longport_api._initialized:
+            return results
+
+        normalized_codes = [normalized for _, normalized in code_pairs]
+        raw_data_dict = await self.longport_api.get_multiple_quotes(normalized_codes)
+
+        # 创建映射表，从标准化代码映射回原始代码
+        code_mapping = {normalized: original for original, normalized in code_pairs}
+
+        now_ts = int(time.time())
+        updates = {}
+        for normalized_code, raw_data in raw_data_dict.items():
+            original_code = code_mapping.get(normalized_code, normalized_code)
+            if not raw_data or 'code' not in raw_data:
+                results[original_code] = None
+                continue
+
+            stock_info = StockInfo.from_raw(raw_data, self._detect_market(normalized_code), update_time=now_ts)
+            results[original_code] = stock_info
+            updates[normalized_code] = stock_info.to_dict()
+
+        # 整批写入缓存
+        self._save_market_cache_bulk(updates)
 
         return results
     
@@ -615,15 +841,17 @@ class StockDataService:
         Returns:
             市场状态字典
         """
-        current_time = datetime.now()
+        # 所有字段共用同一时间戳（市场时间工具按UTC解释时间）
+        current_time = datetime.now(timezone.utc)
         can_order, reason = can_place_order(current_time, market)
+        trading_now = is_trading_time(current_time, market)
 
         return {
-            'current_time': current_time.strftime('%Y-%m-%d %H:%M:%S'),
+            'current_time': current_time.astimezone().strftime('%Y-%m-%d %H:%M:%S'),
             'market': market or 'A',
-            'is_trading_time': is_trading_time(current_time, market),
+            'is_trading_time': trading_now,
             'is_call_auction_time': is_call_auction_time(current_time, market),
             'can_place_order': can_order,
             'reason': reason,
-            'cache_ttl': self._cache_ttl
+            'cache_ttl': self._get_cache_ttl(market or 'A', can_order)
         }
\ No newline at end of file
@@ -1,6 +1,10 @@
 """交易引擎"""
+import asyncio
+import heapq
+import itertools
 import time
-from typing import Optional, Tuple, Dict, Any
+import weakref
+from typing import Optional, Tuple, Dict, Any, List
 from astrbot.api import logger
 from ..models.user import User
 from ..models.stock import StockInfo
@@ -11,6 +15,40 @@ from ..utils.market_time import market_time_manager
 from .market_rules import MarketRulesEngine
 from .currency_service import get_currency_service
 
+# 兜底订单号的进程内序号
+_order_counter = itertools.count(1)
+
+# 市场显示名称和计价货币
+_MARKET_META = {
+    'A': ('A股', 'CNY'),
+    'HK': ('港股', 'HKD'),
+    'US': ('美股', 'USD'),
+}
+
+# 下单行情的复用时间窗口（秒）：窗口内同一股票的并发下单共用一次查询
+_QUOTE_CACHE_TTL = 0.2
+
+# 用户账户锁：同一用户的账户读-改-写串行执行（无人持有的锁自动回收）
+_user_locks: 'weakref.WeakValueDictionary[str, asyncio.Lock]' = weakref.WeakValueDictionary()
+
+
+def user_lock(user_id: str) -> asyncio.Lock:
+    """获取用户账户锁
+
+    读取用户/持仓与写回之间存在await（行情查询、线程池写入），
+    同一用户的并发操作必须持锁串行执行，否则后写入者会覆盖先成交的结果
+
+    Args:
+        user_id: 用户ID
+
+    Returns:
+        该用户的asyncio锁（不可重入）
+    """
+    lock = _user_locks.get(user_id)
+    if lock is None:
+        lock = _user_locks[user_id] = asyncio.Lock()
+    return lock
+
 
 class TradingEngine:
     """交易引擎"""
@@ -18,58 +56,76 @@ class TradingEngine:
     def __init__(self, storage: DataStorage, stock_service=None):
         self.storage = storage
         self.market_rules = MarketRulesEngine(storage)
-        self.stock_service = stock_service  # 依赖注入，避免循环依赖
+        if stock_service is None:
+            # 延迟导入，避免循环依赖
+            from .stock_data import StockDataService
+            stock_service = StockDataService(storage)
+        self.stock_service = stock_service  # 依赖注入
         self.currency_service = get_currency_service(storage)  # 汇率服务
+        self._quote_cache: Dict[str, Tuple[float, asyncio.Task]] = {}  # {股票代码: (发起时间, 行情任务)}
+        # 订单号生成器：存储层提供时直接绑定，否则使用兜底方案
+        self._next_order_id = getattr(storage, 'get_next_order_number', None) or self._fallback_order_id
     
     async def place_buy_order(self, user_id: str, stock_code: str, volume: int,
                             price: Optional[float] = None) -> Tuple[bool, str, Optional[Order]]:
-        """下买单"""
+        """下买单（持用户账户锁，读取的用户和持仓在写回前不会被其他操作修改）"""
+        async with user_lock(user_id):
+            return await self._place_buy_order(user_id, stock_code, volume, price)
+
+    async def _place_buy_order(self, user_id: str, stock_code: str, volume: int,
+                               price: Optional[float] = None) -> Tuple[bool, str, Optional[Order]]:
+        """下买单（调用方须持有用户账户锁）"""
         logger.info(f"[place_buy_order] 开始下单: user={user_id}, stock={stock_code}, volume={volume}, price={price}")
+        now = time.time()  # 本次下单统一使用的时间戳
 
+        stock_task = None
         try:
+            # 提前发起行情请求，与本地数据读取并行
+            stock_task = await self._start_stock_info_fetch(stock_code)
+
             # 1. 获取用户信息
-            logger.info("[place_buy_order] 步骤1: 获取用户信息")
+            logger.debug("[place_buy_order] 步骤1: 获取用户信息")
             user_data = self.storage.get_user(user_id)
             if not user_data:
                 logger.warning("[place_buy_order] 用户未注册")
+                stock_task.cancel()
                 return False, "用户未注册，请先使用 /股票注册 注册账户", None
 
             user = User.from_dict(user_data)
-            logger.info(f"[place_buy_order] 用户余额: {user.balance}")
+            logger.debug(f"[place_buy_order] 用户余额: {user.balance}")
 
-            # 2. 获取股票信息
-            logger.info("[place_buy_order] 步骤2: 获取股票信息")
-            if not self.stock_service:
-                logger.info("[place_buy_order] 初始化股票服务")
-                from .stock_data import StockDataService
-                self.stock_service = StockDataService(self.storage)
+            # 已有持仓（成交时加仓，没有则新建）
+            position_data = self.storage.get_position(user_id, stock_code)
+            position = Position.from_dict(position_data) if position_data else None
 
-            stock_info = await self.stock_service.get_stock_info(stock_code)
-            logger.info(f"[place_buy_order] 股票信息: {stock_info}")
+            # 2. 获取股票信息
+            logger.debug("[place_buy_order] 步骤2: 获取股票信息")
+            stock_info = await stock_task
+            logger.debug("[place_buy_order] 股票信息: %s", stock_info)
 
             if not stock_info:
                 logger.warning(f"[place_buy_order] 无法获取股票信息: {stock_code}")
                 return False, f"无法获取股票{stock_code}的信息", None
 
-            logger.info(f"[place_buy_order] 股票市场: {stock_info.market}, 当前价格: {stock_info.current_price}")
+            logger.debug(f"[place_buy_order] 股票市场: {stock_info.market}, 当前价格: {stock_info.current_price}")
 
             # 3. 确定订单价格和类型
-            logger.info("[place_buy_order] 步骤3: 确定订单价格和类型")
+            logger.debug("[place_buy_order] 步骤3: 确定订单价格和类型")
             if price is None:
                 # 市价单
                 order_price = stock_info.get_market_buy_price()
                 price_type = PriceType.MARKET
-                logger.info(f"[place_buy_order] 市价单，价格: {order_price}")
+                logger.debug(f"[place_buy_order] 市价单，价格: {order_price}")
             else:
                 # 限价单
                 order_price = price
                 price_type = PriceType.LIMIT
-                logger.info(f"[place_buy_order] 限价单，价格: {order_price}")
+                logger.debug(f"[place_buy_order] 限价单，价格: {order_price}")
 
             # 4. 创建订单（暂不生成订单号）
-            logger.info("[place_buy_order] 步骤4: 创建订单对象")
+            logger.debug("[place_buy_order] 步骤4: 创建订单对象")
             order = Order(
-                order_id="",  # 验证通过后再生成
+                order_id="",
                 user_id=user_id,
                 stock_code=stock_code,
                 stock_name=stock_info.name,
@@ -80,14 +136,15 @@ class TradingEngine:
                 filled_volume=0,
                 filled_amount=0,
                 status=OrderStatus.PENDING,
-                create_time=0,  # 将在__post_init__中生成
-                update_time=0   # 将在__post_init__中生成
+                create_time=int(now),
+                update_time=int(now)
             )
-            logger.info(f"[place_buy_order] 订单创建完成: {order.order_type}, {order.price_type}")
+            logger.debug(f"[place_buy_order] 订单创建完成: {order.order_type}, {order.price_type}")
 
             # 5. 市场规则验证（包含涨停跌停检查）
-            logger.info("[place_buy_order] 步骤5: 市场规则验证")
-            is_valid, error_msg = self.market_rules.validate_buy_order(stock_info, order, user.balance)
+            logger.debug("[place_buy_order] 步骤5: 市场规则验证")
+            is_valid, error_msg, total_cost_cny = self.market_rules.validate_buy_order(stock_info, order, user.balance)
+            validated_price = order.order_price
 
             if not is_valid:
                 logger.warning(f"[place_buy_order] 验证失败: {error_msg}")
@@ -95,29 +152,28 @@ class TradingEngine:
 
             logger.info("[place_buy_order] 验证通过")
 
-            # 验证通过后生成订单号
-            if hasattr(self.storage, 'get_next_order_number'):
-                order.order_id = self.storage.get_next_order_number()
-            else:
-                # 兜底方案：使用时间戳+随机数
-                import uuid
-                order.order_id = str(int(time.time() * 1000))[-8:] + str(uuid.uuid4())[-4:]
-
             # 6. 检查交易时间
-            logger.info("[place_buy_order] 步骤6: 检查交易时间")
+            logger.debug("[place_buy_order] 步骤6: 检查交易时间")
             can_trade, trade_msg = market_time_manager.can_place_order(market=stock_info.market)
-            logger.info(f"[place_buy_order] {stock_info.market}市场是否可以交易: {can_trade}, 原因: {trade_msg}")
+            logger.debug(f"[place_buy_order] {stock_info.market}市场是否可以交易: {can_trade}, 原因: {trade_msg}")
 
             # 7. 处理订单
-            logger.info("[place_buy_order] 步骤7: 处理订单")
+            logger.debug("[place_buy_order] 步骤7: 处理订单")
+            # 市价单必须在可交易时间内立即成交
+            if order.is_market_order() and not can_trade:
+                logger.warning(f"[place_buy_order] 市价单只能在可交易时间内下单，当前市场: {stock_info.market}")
+                return False, "市价单只能在交易时间内下单", None
+
+            # 所有拒绝条件检查完毕后再生成订单号，被拒绝的订单不占用序号
+            order.order_id = self._next_order_id()
+
             if order.is_market_order():
-                # 市价单必须在可交易时间内立即成交
-                if not can_trade:
-                    logger.warning(f"[place_buy_order] 市价单只能在可交易时间内下单，当前市场: {stock_info.market}")
-                    return False, "市价单只能在交易时间内下单", None
                 order.order_price = stock_info.current_price
-                logger.info(f"[place_buy_order] 执行市价买单，价格: {order.order_price}")
-                return await self._execute_buy_order_immediately(user, order, stock_info)
+                logger.debug(f"[place_buy_order] 执行市价买单，价格: {order.order_price}")
+                # 成交价与验证时的委托价一致时直接复用已算好的费用
+                return await self._execute_buy_order_immediately(
+                    user, order, stock_info, position,
+                    total_cost_cny if order.order_price == validated_price else None)
             else:
                 # 限价单处理
                 # 对于限价单，即使不在交易时间也可以下单（挂单）
@@ -125,113 +181,195 @@ class TradingEngine:
                 if can_trade and order.order_price >= stock_info.current_price:
                     # 可交易且价格满足，使用当前价格立即成交
                     order.order_price = stock_info.current_price
-                    logger.info(f"[place_buy_order] 执行限价买单（立即成交），价格: {order.order_price}")
-                    return await self._execute_buy_order_immediately(user, order, stock_info)
+                    logger.debug(f"[place_buy_order] 执行限价买单（立即成交），价格: {order.order_price}")
+                    return await self._execute_buy_order_immediately(
+                        user, order, stock_info, position,
+                        total_cost_cny if order.order_price == validated_price else None)
                 else:
                     # 非交易时间或价格不满足立即成交条件，挂单等待
-                    logger.info("[place_buy_order] 挂单等待")
-                    return await self._place_pending_buy_order(user, order, stock_info)
+                    logger.debug("[place_buy_order] 挂单等待")
+                    return await self._place_pending_buy_order(user, order, stock_info, can_trade, total_cost_cny)
 
         except Exception as e:
+            if stock_task and not stock_task.done():
+                stock_task.cancel()
             logger.error(f"[place_buy_order] 下单过程出错: {e}", exc_info=True)
             return False, f"下单失败: {str(e)}", None
     
     async def place_sell_order(self, user_id: str, stock_code: str, volume: int,
                              price: Optional[float] = None) -> Tuple[bool, str, Optional[Order]]:
-        """下卖单"""
-        # 1. 获取用户信息
-        user_data = self.storage.get_user(user_id)
-        if not user_data:
-            return False, "用户未注册，请先使用 /股票注册 注册账户", None
-        
-        user = User.from_dict(user_data)
-        
-        # 2. 获取持仓信息
-        position_data = self.storage.get_position(user_id, stock_code)
-        position = Position.from_dict(position_data) if position_data else None
-        
-        # 3. 获取股票信息
-        if not self.stock_service:
-            from .stock_data import StockDataService
-            self.stock_service = StockDataService(self.storage)
-        stock_info = await self.stock_service.get_stock_info(stock_code)
-        
-        if not stock_info:
-            return False, f"无法获取股票{stock_code}的信息", None
-        
-        # 4. 确定订单价格和类型
-        if price is None:
-            # 市价单
-            order_price = stock_info.get_market_sell_price()
-            price_type = PriceType.MARKET
-        else:
-            # 限价单
-            order_price = price
-            price_type = PriceType.LIMIT
-        
-        # 5. 创建订单（暂不生成订单号）
-        order = Order(
-            order_id="",
-            user_id=user_id,
-            stock_code=stock_code,
-            stock_name=stock_info.name,
-            order_type=OrderType.SELL,
-            price_type=price_type,
-            order_price=order_price,
-            order_volume=volume,
-            filled_volume=0,
-            filled_amount=0,
-            status=OrderStatus.PENDING,
-            create_time=0,
-            update_time=0
-        )
-        
-        # 6. 市场规则验证（包含涨停跌停检查）
-        is_valid, error_msg = self.market_rules.validate_sell_order(stock_info, order, position)
-        if not is_valid:
-            return False, error_msg, None
-        
-        # 验证通过后生成订单号
-        if hasattr(self.storage, 'get_next_order_number'):
-            order.order_id = self.storage.get_next_order_number()
-        else:
-            # 兜底方案：使用时间戳+随机数
-            import uuid
-            order.order_id = str(int(time.time() * 1000))[-8:] + str(uuid.uuid4())[-4:]
-        
-        # 7. 检查交易时间
-        is_trading_time = market_time_manager.is_trading_time(market=stock_info.market)
+        """下卖单（持用户账户锁，读取的用户和持仓在写回前不会被其他操作修改）"""
+        async with user_lock(user_id):
+            return await self._place_sell_order(user_id, stock_code, volume, price)
+
+    async def _place_sell_order(self, user_id: str, stock_code: str, volume: int,
+                                price: Optional[float] = None) -> Tuple[bool, str, Optional[Order]]:
+        """下卖单（调用方须持有用户账户锁）"""
+        now = time.time()  # 本次下单统一使用的时间戳
+
+        stock_task = None
+        try:
+            # 提前发起行情请求，与本地数据读取并行
+            stock_task = await self._start_stock_info_fetch(stock_code)
+
+            # 1. 获取用户信息
+            user_data = self.storage.get_user(user_id)
+            if not user_data:
+                stock_task.cancel()
+                return False, "用户未注册，请先使用 /股票注册 注册账户", None
+
+            user = User.from_dict(user_data)
+
+            # 2. 获取持仓信息
+            position_data = self.storage.get_position(user_id, stock_code)
+            position = Position.from_dict(position_data) if position_data else None
+
+            # 3. 获取股票信息
+            stock_info = await stock_task
+
+            if not stock_info:
+                return False, f"无法获取股票{stock_code}的信息", None
 
-        # 8. 处理订单（确保position不为None）
-        if not position:
-            return False, "您没有持有该股票，无法卖出", None
+            # 4. 确定订单价格和类型
+            if price is None:
+                # 市价单
+                order_price = stock_info.get_market_sell_price()
+                price_type = PriceType.MARKET
+            else:
+                # 限价单
+                order_price = price
+                price_type = PriceType.LIMIT
+
+            # 5. 创建订单（暂不生成订单号）
+            order = Order(
+                order_id="",
+                user_id=user_id,
+                stock_code=stock_code,
+                stock_name=stock_info.name,
+                order_type=OrderType.SELL,
+                price_type=price_type,
+                order_price=order_price,
+                order_volume=volume,
+                filled_volume=0,
+                filled_amount=0,
+                status=OrderStatus.PENDING,
+                create_time=int(now),
+                update_time=int(now)
+            )
+
+            # 6. 市场规则验证（包含涨停跌停检查）
+            is_valid, error_msg = self.market_rules.validate_sell_order(stock_info, order, position)
+            if not is_valid:
+                return False, error_msg, None
+
+            # 7. 检查交易时间
+            is_trading_time = market_time_manager.is_trading_time(market=stock_info.market)
+
+            # 8. 处理订单（确保position不为None）
+            if not position:
+                return False, "您没有持有该股票，无法卖出", None
 
-        if order.is_market_order():
             # 市价单必须在交易时间内立即成交
-            if not is_trading_time:
+            if order.is_market_order() and not is_trading_time:
                 return False, "市价单只能在交易时间内下单", None
-            order.order_price = stock_info.current_price
-            return await self._execute_sell_order_immediately(user, order, position, stock_info)
-        else:
-            # 限价单处理
-            if is_trading_time and order.order_price <= stock_info.current_price:
-                # 交易时间内且可以立即成交，使用当前价格
+
+            # 所有拒绝条件检查完毕后再生成订单号，被拒绝的订单不占用序号
+            order.order_id = self._next_order_id()
+
+            if order.is_market_order():
                 order.order_price = stock_info.current_price
                 return await self._execute_sell_order_immediately(user, order, position, stock_info)
             else:
-                # 非交易时间或价格不满足立即成交条件，挂单等待
-                return await self._place_pending_sell_order(user, order, position, stock_info)
+                # 限价单处理
+                if is_trading_time and order.order_price <= stock_info.current_price:
+                    # 交易时间内且可以立即成交，使用当前价格
+                    order.order_price = stock_info.current_price
+                    return await self._execute_sell_order_immediately(user, order, position, stock_info)
+                else:
+                    # 非交易时间或价格不满足立即成交条件，挂单等待
+                    return await self._place_pending_sell_order(user, order, position, stock_info, is_trading_time)
+
+        except Exception as e:
+            if stock_task and not stock_task.done():
+                stock_task.cancel()
+            logger.error(f"[place_sell_order] 下单过程出错: {e}", exc_info=True)
+            return False, f"下单失败: {str(e)}", None
     
-    async def _execute_buy_order_immediately(self, user: User, order: Order,
-                                           stock_info: StockInfo) -> Tuple[bool, str, Order]:
-        """立即执行买入订单"""
+    @staticmethod
+    def _fallback_order_id() -> str:
+        """兜底订单号：时间戳+进程内序号"""
+        return f"{int(time.time() * 1000) % 100000000:08d}{next(_order_counter) % 10000:04d}"
+
+    async def _start_stock_info_fetch(self, stock_code: str) -> asyncio.Task:
+        """发起行情请求任务
+
+        让出一次事件循环使请求先发出，调用方随后读取本地数据时网络请求已在进行中
+
+        Args:
+            stock_code: 股票代码
+
+        Returns:
+            行情请求任务
+        """
+        task = asyncio.create_task(self._get_quote(stock_code))
+        await asyncio.sleep(0)
+        return task
+
+    async def _get_quote(self, stock_code: str) -> Optional[StockInfo]:
+        """获取下单用行情，短时间内同一股票的请求共用一次查询
+
+        Args:
+            stock_code: 股票代码
+
+        Returns:
+            股票信息或None
+        """
+        now = time.monotonic()
+        entry = self._quote_cache.get(stock_code)
+        if entry and now - entry[0] < _QUOTE_CACHE_TTL:
+            task = entry[1]
+        else:
+            # 下单按行情成交，不使用休市缓存捷径，避免集合竞价、盘前盘后按隔夜旧价成交
+            task = asyncio.create_task(self.stock_service.get_stock_info(stock_code, allow_closed_cache=False))
+            task.add_done_callback(self._log_quote_failure)
+            self._quote_cache[stock_code] = (now, task)
+            asyncio.get_running_loop().call_later(_QUOTE_CACHE_TTL, self._evict_quote, stock_code, task)
+
+        # shield：单个下单被取消时不影响共用该查询的其他下单
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _log_quote_failure(task: asyncio.Task):
+        """取出共用行情任务的异常（所有下单均已取消时无人等待，否则会产生未检索异常告警）"""
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"[行情查询] 下单行情获取失败: {task.exception()}")
+
+    def _evict_quote(self, stock_code: str, task: asyncio.Task):
+        """行情复用窗口结束后移除缓存（已被更新的条目保留）"""
+        entry = self._quote_cache.get(stock_code)
+        if entry and entry[1] is task:
+            del self._quote_cache[stock_code]
+
+    async def _execute_buy_order_immediately(self, user: User, order: Order, stock_info: StockInfo,
+                                           position: Optional[Position] = None,
+                                           total_cost_cny: Optional[float] = None) -> Tuple[bool, str, Order]:
+        """立即执行买入订单
+
+        Args:
+            user: 用户对象
+            order: 买入订单
+            stock_info: 股票信息
+            position: 该股票的已有持仓，没有则为None
+            total_cost_cny: 验证阶段按成交价算好的买入费用（人民币），为None时重新计算
+        """
         # 1. 计算实际费用（考虑汇率）
-        total_cost_cny = self.market_rules.calculate_buy_amount(order.order_volume, order.order_price, stock_info.market)
+        if total_cost_cny is None:
+            total_cost_cny = self.market_rules.calculate_buy_amount(order.order_volume, order.order_price, stock_info.market)
 
         # 2. 检查资金
         if not user.can_buy(total_cost_cny):
             # 格式化金额显示
-            market_name = 'A股' if stock_info.market == 'A' else ('港股' if stock_info.market == 'HK' else '美股')
+            market_name, _ = _MARKET_META.get(stock_info.market, _MARKET_META['A'])
             formatted_cost = self.currency_service.format_currency(total_cost_cny, 'CNY')
             formatted_balance = self.currency_service.format_currency(user.balance, 'CNY')
             return False, f"资金不足，需要{formatted_cost}（{market_name}），可用余额{formatted_balance}", order
@@ -243,9 +381,7 @@ class TradingEngine:
         order.fill_order(order.order_volume, order.order_price)
         
         # 5. 更新或创建持仓
-        position_data = self.storage.get_position(user.user_id, order.stock_code)
-        if position_data:
-            position = Position.from_dict(position_data)
+        if position:
             position.add_position(order.order_volume, order.order_price)
         else:
             position = Position(
@@ -260,32 +396,26 @@ class TradingEngine:
                 profit_loss=0,
                 profit_loss_percent=0,
                 last_price=stock_info.current_price,
-                update_time=int(time.time()),
+                update_time=order.update_time,  # 与订单成交时间一致
                 market=stock_info.market  # 保存市场类型
             )
         
         # 6. 更新持仓市值
         position.update_market_data(stock_info.current_price)
-        
-        # 7. 保存数据
-        self.storage.save_user(user.user_id, user.to_dict())
-        self.storage.save_position(user.user_id, order.stock_code, position.to_dict())
-        self.storage.save_order(order.order_id, order.to_dict())
 
-        # 8. 更新总资产（校正）
-        await self.update_user_assets(user.user_id)
+        # 7. 更新总资产（校正）
+        self._refresh_total_assets(user, order.stock_code, position)
+
+        # 8. 保存数据
+        await self._save_batch_async([
+            ('user', user.user_id, user.to_dict()),
+            ('position', user.user_id, order.stock_code, position.to_dict()),
+            ('order', order.order_id, order.to_dict()),
+        ])
 
         # 格式化金额显示
         formatted_cost = self.currency_service.format_currency(total_cost_cny, 'CNY')
-        price_display = f"{order.order_price:.2f}"
-
-        # 根据市场显示正确的价格单位
-        if stock_info.market == 'HK':
-            price_display += f" HKD (≈{formatted_cost})"
-        elif stock_info.market == 'US':
-            price_display += f" USD (≈{formatted_cost})"
-        else:
-            price_display = f"{formatted_cost} CNY"
+        price_display = self._format_price_display(order, stock_info.market, formatted_cost)
 
         return True, f"买入成功！{order.stock_name} {order.order_volume}股，价格{price_display}，总费用{formatted_cost}", order
     
@@ -310,38 +440,59 @@ class TradingEngine:
         if not position.is_empty():
             position.update_market_data(stock_info.current_price)
 
-        # 6. 保存数据
-        self.storage.save_user(user.user_id, user.to_dict())
+        # 6. 更新总资产（校正）
+        self._refresh_total_assets(user, order.stock_code, position)
 
+        # 7. 保存数据
         if position.is_empty():
-            self.storage.delete_position(user.user_id, order.stock_code)
+            position_op = ('delete_position', user.user_id, order.stock_code)
         else:
-            self.storage.save_position(user.user_id, order.stock_code, position.to_dict())
-
-        self.storage.save_order(order.order_id, order.to_dict())
+            position_op = ('position', user.user_id, order.stock_code, position.to_dict())
 
-        # 7. 更新总资产（校正）
-        await self.update_user_assets(user.user_id)
+        await self._save_batch_async([
+            ('user', user.user_id, user.to_dict()),
+            position_op,
+            ('order', order.order_id, order.to_dict()),
+        ])
 
         # 格式化金额显示
-        market_name = 'A股' if stock_info.market == 'A' else ('港股' if stock_info.market == 'HK' else '美股')
         formatted_income = self.currency_service.format_currency(total_income_cny, 'CNY')
-        price_display = f"{order.order_price:.2f}"
-
-        # 根据市场显示正确的价格单位
-        if stock_info.market == 'HK':
-            price_display += f" HKD (≈{formatted_income})"
-        elif stock_info.market == 'US':
-            price_display += f" USD (≈{formatted_income})"
-        else:
-            price_display = f"{formatted_income} CNY"
+        price_display = self._format_price_display(order, stock_info.market, formatted_income)
 
         return True, f"卖出成功！{order.stock_name} {order.order_volume}股，价格{price_display}，到账{formatted_income}", order
     
-    async def _place_pending_buy_order(self, user: User, order: Order, stock_info: StockInfo) -> Tuple[bool, str, Order]:
-        """挂买单"""
+    @staticmethod
+    def _format_price_display(order: Order, market: str, formatted_amount_cny: str) -> str:
+        """根据市场显示正确的价格单位
+
+        Args:
+            order: 已成交订单
+            market: 市场类型
+            formatted_amount_cny: 已格式化的人民币金额
+
+        Returns:
+            价格显示文本
+        """
+        _, currency = _MARKET_META.get(market, _MARKET_META['A'])
+        if currency == 'CNY':
+            return f"{formatted_amount_cny} CNY"
+        return f"{order.order_price:.2f} {currency} (≈{formatted_amount_cny})"
+
+    async def _place_pending_buy_order(self, user: User, order: Order, stock_info: StockInfo,
+                                       is_trading_time: bool,
+                                       total_cost_cny: Optional[float] = None) -> Tuple[bool, str, Order]:
+        """挂买单
+
+        Args:
+            user: 用户对象
+            order: 买入订单
+            stock_info: 股票信息
+            is_trading_time: 下单时是否为可交易时间（由调用方判断，保证前后一致）
+            total_cost_cny: 验证阶段按委托价算好的冻结金额（人民币），为None时重新计算
+        """
         # 1. 冻结资金（考虑汇率）
-        total_cost_cny = self.market_rules.calculate_buy_amount(order.order_volume, order.order_price, stock_info.market)
+        if total_cost_cny is None:
+            total_cost_cny = self.market_rules.calculate_buy_amount(order.order_volume, order.order_price, stock_info.market)
 
         if not user.can_buy(total_cost_cny):
             formatted_cost = self.currency_service.format_currency(total_cost_cny, 'CNY')
@@ -349,16 +500,16 @@ class TradingEngine:
             return False, f"资金不足，需要{formatted_cost}，可用余额{formatted_balance}", order
 
         user.deduct_balance(total_cost_cny)
+        # 挂单不改变持仓，直接按现有持仓校正总资产
+        user.update_total_assets(self._compute_total_assets(user, self.storage.get_positions(user.user_id)))
 
-        # 2. 保存挂单
-        self.storage.save_order(order.order_id, order.to_dict())
-        self.storage.save_user(user.user_id, user.to_dict())
-
-        # 3. 更新总资产（校正）
-        await self.update_user_assets(user.user_id)
+        # 2. 保存挂单和用户（一次写入）
+        await self._save_batch_async([
+            ('order', order.order_id, order.to_dict()),
+            ('user', user.user_id, user.to_dict()),
+        ])
 
         # 根据交易时间给出不同的提示信息
-        is_trading_time = market_time_manager.is_trading_time(market=stock_info.market)
         if is_trading_time:
             message = f"买入挂单成功！{order.stock_name} {order.order_volume}股，价格{order.order_price:.2f}元，订单号{order.order_id}"
         else:
@@ -366,16 +517,24 @@ class TradingEngine:
         
         return True, message, order
     
-    async def _place_pending_sell_order(self, user: User, order: Order, position: Position, stock_info: StockInfo) -> Tuple[bool, str, Order]:
-        """挂卖单"""
+    async def _place_pending_sell_order(self, user: User, order: Order, position: Position, stock_info: StockInfo,
+                                        is_trading_time: bool) -> Tuple[bool, str, Order]:
+        """挂卖单
+
+        Args:
+            user: 用户对象
+            order: 卖出订单
+            position: 持仓
+            stock_info: 股票信息
+            is_trading_time: 下单时是否为交易时间（由调用方判断，保证前后一致）
+        """
         # 1. 冻结股票（这里简化处理，实际应该单独记录冻结数量）
         # 为简化，我们不实际冻结，在成交时再次检查
 
         # 2. 保存挂单
-        self.storage.save_order(order.order_id, order.to_dict())
+        await self._save_batch_async([('order', order.order_id, order.to_dict())])
 
         # 根据交易时间给出不同的提示信息
-        is_trading_time = market_time_manager.is_trading_time(market=stock_info.market)
         if is_trading_time:
             message = f"卖出挂单成功！{order.stock_name} {order.order_volume}股，价格{order.order_price:.2f}元，订单号{order.order_id}"
         else:
@@ -384,7 +543,12 @@ class TradingEngine:
         return True, message, order
     
     async def cancel_order(self, user_id: str, order_id: str) -> Tuple[bool, str]:
-        """撤销订单"""
+        """撤销订单（持用户账户锁，退款写回前余额不会被其他操作覆盖）"""
+        async with user_lock(user_id):
+            return await self._cancel_order(user_id, order_id)
+
+    async def _cancel_order(self, user_id: str, order_id: str) -> Tuple[bool, str]:
+        """撤销订单（调用方须持有用户账户锁）"""
         # 1. 获取订单
         order_data = self.storage.get_order(order_id)
         if not order_data:
@@ -403,6 +567,8 @@ class TradingEngine:
         # 4. 撤销订单
         order.cancel_order()
         
+        ops = [('order', order.order_id, order.to_dict())]
+
         # 5. 退还资金（如果是买单）
         if order.is_buy_order():
             user_data = self.storage.get_user(user_id)
@@ -410,12 +576,12 @@ class TradingEngine:
                 user = User.from_dict(user_data)
                 total_cost = self.market_rules.calculate_buy_amount(order.order_volume, order.order_price)
                 user.add_balance(total_cost)
-                self.storage.save_user(user_id, user.to_dict())
-                # 更新总资产（校正）
-                await self.update_user_assets(user_id)
+                # 总资产 = 可用余额 + 持仓市值：撤单只把冻结资金退回余额，持仓市值不变
+                user.update_total_assets(user.total_assets + total_cost)
+                ops.append(('user', user_id, user.to_dict()))
 
-        # 6. 保存订单
-        self.storage.save_order(order.order_id, order.to_dict())
+        # 6. 保存订单（和退款后的用户数据一起写入）
+        await self._save_batch_async(ops)
         
         return True, f"订单撤销成功！{order.stock_name} {order.order_volume}股"
     
@@ -428,35 +594,99 @@ class TradingEngine:
         - 可用余额(balance)已经扣除了冻结资金
         - 冻结资金是买入挂单时从balance中扣除的
         - 因此不能重复加上冻结资金
+
+        持用户账户锁执行，调用方不能已持有该锁
         """
-        user_data = self.storage.get_user(user_id)
-        if not user_data:
-            return
+        async with user_lock(user_id):
+            user_data = self.storage.get_user(user_id)
+            if not user_data:
+                return
 
-        user = User.from_dict(user_data)
-        positions = self.storage.get_positions(user_id)
+            user = User.from_dict(user_data)
+            user.update_total_assets(self._compute_total_assets(user, self.storage.get_positions(user_id)))
+            await self._save_batch_async([('user', user_id, user.to_dict())])
+
+    def _compute_total_assets(self, user: User, positions: list) -> float:
+        """计算用户总资产：可用余额 + 持仓市值（人民币）
+
+        不加冻结资金，因为冻结资金已经从balance中扣除
+
+        Args:
+            user: 用户对象
+            positions: 持仓数据列表
+
+        Returns:
+            总资产（人民币）
+        """
+        return user.balance + self._calculate_market_value_cny(positions)
+
+    async def _save_batch_async(self, ops: list):
+        """在线程池中执行批量写入，避免文件IO阻塞事件循环
+
+        等待写入期间会让出事件循环，调用方须持有用户账户锁（见user_lock）
+
+        Args:
+            ops: 写入操作列表，格式见DataStorage.save_batch
+        """
+        await asyncio.to_thread(self.storage.save_batch, ops)
+
+    def _refresh_total_assets(self, user: User, stock_code: str, position: Position):
+        """用内存中刚更新的持仓重新计算用户总资产（不写入存储）
+
+        Args:
+            user: 用户对象（余额已更新）
+            stock_code: 本次成交的股票代码
+            position: 本次成交后的持仓
+        """
+        positions = [pos for pos in self.storage.get_positions(user.user_id)
+                     if pos.get('stock_code') != stock_code]
+        if not position.is_empty():
+            positions.append(position.to_dict())
+        user.update_total_assets(self._compute_total_assets(user, positions))
 
-        # 计算持仓市值（考虑汇率转换为人民币）
+    def _calculate_market_value_cny(self, positions: list) -> float:
+        """计算持仓总市值（考虑汇率转换为人民币）
+
+        Args:
+            positions: 持仓数据列表
+
+        Returns:
+            持仓总市值（人民币）
+        """
+        if all(pos_data.get('market', 'A') == 'A' for pos_data in positions):
+            # 全部为A股时直接用人民币市值求和，无需汇率换算
+            return sum(pos_data.get('market_value', 0) for pos_data in positions)
+
+        rates = {}
         total_market_value = 0
         for pos_data in positions:
-            market = pos_data.get('market', 'A')
-            market_value_local = pos_data.get('market_value', 0)
             # 将市值转换为人民币
+            rate = self._get_cny_rate(pos_data.get('market', 'A'), rates)
+            total_market_value += pos_data.get('market_value', 0) * rate
+        return total_market_value
+
+    def _get_cny_rate(self, market: str, rates: Dict[str, float]) -> float:
+        """获取市场计价货币兑人民币的汇率
+
+        Args:
+            market: 市场类型（'A', 'HK', 'US'）
+            rates: 单次计算内的汇率缓存，同一市场只查询一次
+
+        Returns:
+            汇率（A股为1.0）
+        """
+        rate = rates.get(market)
+        if rate is None:
             if market == 'A':
                 # A股直接用人民币计价
-                total_market_value += market_value_local
+                rate = 1.0
             else:
                 # 港股美股需要汇率转换
                 rate = self.currency_service.get_exchange_rate(
                     self.currency_service.get_currency_by_market(market), 'CNY'
                 )
-                total_market_value += market_value_local * rate
-
-        # 更新总资产：可用余额 + 持仓市值（人民币）
-        # 注意：不加冻结资金,因为冻结资金已经从balance中扣除
-        total_assets = user.balance + total_market_value
-        user.update_total_assets(total_assets)
-        self.storage.save_user(user_id, user.to_dict())
+            rates[market] = rate
+        return rate
     
     def get_user_trading_summary(self, user_id: str) -> Dict[str, Any]:
         """获取用户交易汇总"""
@@ -468,29 +698,28 @@ class TradingEngine:
         positions = self.storage.get_positions(user_id)
         orders = self.storage.get_orders(user_id)
 
-        # 计算统计数据（考虑汇率转换为人民币）
+        # 按市场分组累加原币市值和盈亏，最后每个市场只做一次汇率换算
+        market_totals: Dict[str, List[float]] = {}
+        total_positions = 0
+        for pos in positions:
+            totals = market_totals.get(pos.get('market', 'A'))
+            if totals is None:
+                totals = market_totals[pos.get('market', 'A')] = [0, 0]
+            totals[0] += pos.get('market_value', 0)
+            totals[1] += pos.get('profit_loss', 0)
+            if pos.get('total_volume', 0) > 0:
+                total_positions += 1
+
+        # 转换为人民币（A股直接用人民币计价）
+        rates = {}
         total_market_value_cny = 0
         total_profit_loss_cny = 0
-        for pos in positions:
-            market = pos.get('market', 'A')
-            market_value_local = pos.get('market_value', 0)
-            profit_loss_local = pos.get('profit_loss', 0)
-
-            # 将市值和盈亏转换为人民币
-            if market == 'A':
-                # A股直接用人民币计价
-                total_market_value_cny += market_value_local
-                total_profit_loss_cny += profit_loss_local
-            else:
-                # 港股美股需要汇率转换
-                rate = self.currency_service.get_exchange_rate(
-                    self.currency_service.get_currency_by_market(market), 'CNY'
-                )
-                total_market_value_cny += market_value_local * rate
-                total_profit_loss_cny += profit_loss_local * rate
+        for market, (market_value, profit_loss) in market_totals.items():
+            rate = self._get_cny_rate(market, rates)
+            total_market_value_cny += market_value * rate
+            total_profit_loss_cny += profit_loss * rate
 
-        total_positions = len([pos for pos in positions if pos.get('total_volume', 0) > 0])
-        pending_orders = len([order for order in orders if order.get('status') == 'pending'])
+        pending_orders = sum(1 for order in orders if order.get('status') == 'pending')
 
         return {
             'user': user.to_dict(),
@@ -499,5 +728,5 @@ class TradingEngine:
             'total_positions': total_positions,
             'pending_orders': pending_orders,
             'positions': positions,
-            'recent_orders': sorted(orders, key=lambda x: x.get('create_time', 0), reverse=True)[:5]
+            'recent_orders': heapq.nlargest(5, orders, key=lambda x: x.get('create_time', 0))
         }
@@ -0,0 +1,68 @@
+"""股票代码验证测试"""
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+# 插件以包内相对导入组织，validators不依赖其他模块，按文件路径直接加载
+_spec = importlib.util.spec_from_file_location(
+    'validators', Path(__file__).resolve().parent.parent / 'utils' / 'validators.py')
+validators = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(validators)
+
+
+@pytest.mark.parametrize('code', [
+    '600000', '000001', '300750', '688981', '430047', '830799', '870204',
+    '600000.A', '00700', '0700', '00700.HK', '0700.hk',
+    'AAPL', 'aapl', 'AAPL.US', 'BRK.A.US', 'BRK.B.US', 'ABCDE.US',
+])
+def test_valid_stock_codes(code):
+    assert validators.is_valid_stock_code(code) is True
+
+
+@pytest.mark.parametrize('code', [
+    # 格式错误的美股代码
+    '..A.US', '.A.US', 'X.HK.US', 'X.US.US', 'BRK..US', 'BRK.B.C.US', 'BRK.ABC.US', 'ABCDEF.US', '.US',
+    # 后缀不匹配
+    '600000.APL', '00700.HKG', '00700.HK.US', 'BRK.A', 'AAPL.HK', '1234.US',
+    # 指数及其他
+    '399001', '6000000', '123', '①②③④', 'ＡＡＰＬ', '', '   ', None, 600000,
+])
+def test_invalid_stock_codes(code):
+    assert validators.is_valid_stock_code(code) is False
+
+
+def test_parse_order_params_batch_keeps_input_order():
+    results = validators.parse_order_params_batch([
+        ['600000', '100'],
+        ['00700.HK', '200', '320.5'],
+        ['aapl', '10'],
+    ])
+    assert [(r.stock_code, r.volume, r.price, r.is_market_order) for r in results] == [
+        ('600000', 100, None, True),
+        ('00700.HK', 200, 320.5, False),
+        ('AAPL', 10, None, True),
+    ]
+    assert all(r.error is None for r in results)
+
+
+def test_parse_order_params_batch_reports_errors_per_order():
+    results = validators.parse_order_params_batch([
+        ['600000'],
+        ['600000', '100'],
+        ['   ', '100'],
+        ['600000', 'abc'],
+        ['600000', '100', '-1'],
+    ])
+    assert [r.error is None for r in results] == [False, True, False, False, False]
+    assert results[1].volume == 100
+    # 出错前已解析的字段保留
+    assert results[3].stock_code == '600000'
+    assert results[4].volume == 100
+
+
+def test_parse_order_params_batch_matches_single_parse():
+    batch = [['600000', '100', '10.5'], ['00700', '0'], ['BRK.B.US', '5']]
+    assert validators.parse_order_params_batch(batch) == [validators.parse_order_params(p) for p in batch]
+    assert validators.parse_order_params_batch([]) == []
+    assert validators.Validators.parse_order_params_batch is validators.parse_order_params_batch
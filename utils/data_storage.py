@@ -1,12 +1,23 @@
 """数据存储工具"""
+import functools
 import json
 import os
+import threading
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 from astrbot.api.star import StarTools
 from astrbot.api import logger
 
 
+def _locked(method):
+    """在存储锁内执行读-改-写操作，避免与后台线程中的写入交错"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class DataStorage:
     """数据存储管理器"""
     
@@ -14,6 +25,7 @@ class DataStorage:
         """初始化数据存储"""
         self.plugin_name = plugin_name
         self.plugin_config = plugin_config
+        self._lock = threading.RLock()  # 写操作可能在线程池中执行（见save_batch）
         self.data_dir = StarTools.get_data_dir(plugin_name)
         self._ensure_data_structure()
     
@@ -85,11 +97,13 @@ class DataStorage:
             return {}
     
     def _save_json(self, filename: str, data: Dict[str, Any]):
-        """保存JSON文件"""
+        """保存JSON文件（先写临时文件再替换，读取方不会读到写了一半的文件）"""
         file_path = self._get_file_path(filename)
+        tmp_path = file_path.with_name(file_path.name + '.tmp')
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, file_path)
         except Exception as e:
             logger.error(f"保存文件失败 {filename}: {e}")
     
@@ -99,6 +113,7 @@ class DataStorage:
         users = self._load_json('users.json')
         return users.get(user_id)
     
+    @_locked
     def save_user(self, user_id: str, user_data: Dict[str, Any]):
         """保存用户数据"""
         users = self._load_json('users.json')
@@ -109,6 +124,7 @@ class DataStorage:
         """获取所有用户数据"""
         return self._load_json('users.json')
     
+    @_locked
     def delete_user(self, user_id: str):
         """删除用户数据"""
         users = self._load_json('users.json')
@@ -124,6 +140,7 @@ class DataStorage:
             return [order for order in orders.values() if order.get('user_id') == user_id]
         return list(orders.values())
     
+    @_locked
     def get_next_order_number(self) -> str:
         """获取下一个订单号（五位数字序号）"""
         counter_data = self._load_json('order_counter.json')
@@ -143,6 +160,7 @@ class DataStorage:
         # 返回五位数字字符串，不足补零
         return f"{next_number:05d}"
     
+    @_locked
     def save_order(self, order_id: str, order_data: Dict[str, Any]):
         """保存订单数据"""
         orders = self._load_json('orders.json')
@@ -154,6 +172,7 @@ class DataStorage:
         orders = self._load_json('orders.json')
         return orders.get(order_id)
     
+    @_locked
     def delete_order(self, order_id: str):
         """删除订单"""
         orders = self._load_json('orders.json')
@@ -252,6 +271,7 @@ class DataStorage:
         user_positions = positions.get(user_id, {})
         return list(user_positions.values())
     
+    @_locked
     def save_position(self, user_id: str, stock_code: str, position_data: Dict[str, Any]):
         """保存持仓数据"""
         positions = self._load_json('positions.json')
@@ -265,6 +285,7 @@ class DataStorage:
         positions = self._load_json('positions.json')
         return positions.get(user_id, {}).get(stock_code)
     
+    @_locked
     def delete_position(self, user_id: str, stock_code: str):
         """删除持仓"""
         positions = self._load_json('positions.json')
@@ -274,18 +295,71 @@ class DataStorage:
                 del positions[user_id]
             self._save_json('positions.json', positions)
     
+    # 批量写入操作
+    @_locked
+    def save_batch(self, ops: List[tuple]):
+        """批量保存用户、持仓、订单数据（每个数据文件只读写一次）
+
+        Args:
+            ops: 操作列表，支持以下格式：
+                ('user', user_id, user_data)
+                ('position', user_id, stock_code, position_data)
+                ('delete_position', user_id, stock_code)
+                ('order', order_id, order_data)
+        """
+        files = {'user': 'users.json', 'position': 'positions.json',
+                 'delete_position': 'positions.json', 'order': 'orders.json'}
+        loaded = {}
+        for op in ops:
+            filename = files[op[0]]
+            if filename not in loaded:
+                loaded[filename] = self._load_json(filename)
+
+        for op in ops:
+            kind = op[0]
+            if kind == 'user':
+                loaded['users.json'][op[1]] = op[2]
+            elif kind == 'order':
+                loaded['orders.json'][op[1]] = op[2]
+            elif kind == 'position':
+                loaded['positions.json'].setdefault(op[1], {})[op[2]] = op[3]
+            else:
+                user_positions = loaded['positions.json'].get(op[1])
+                if user_positions and op[2] in user_positions:
+                    del user_positions[op[2]]
+                    if not user_positions:  # 如果用户没有任何持仓，删除用户条目
+                        del loaded['positions.json'][op[1]]
+
+        for filename, data in loaded.items():
+            self._save_json(filename, data)
+
     # 市场数据缓存操作
     def get_market_cache(self, stock_code: str) -> Optional[Dict[str, Any]]:
         """获取市场数据缓存"""
         cache = self._load_json('market_data_cache.json')
         return cache.get(stock_code)
     
+    @_locked
     def save_market_cache(self, stock_code: str, market_data: Dict[str, Any]):
         """保存市场数据缓存"""
         cache = self._load_json('market_data_cache.json')
         cache[stock_code] = market_data
         self._save_json('market_data_cache.json', cache)
+
+    @_locked
+    def save_market_cache_bulk(self, updates: Dict[str, Dict[str, Any]]):
+        """批量保存市场数据缓存（一次读写缓存文件）
+
+        Args:
+            updates: {股票代码: 行情数据} 字典
+        """
+        if not updates:
+            return
+        cache = self._load_json('market_data_cache.json')
+        cache.update(updates)
+        self._save_json('market_data_cache.json', cache)
     
+    @_locked
     def clear_market_cache(self):
         """清空市场数据缓存"""
         self._save_json('market_data_cache.json', {})
@@ -295,6 +369,7 @@ class DataStorage:
         """获取配置"""
         return self._load_json('config.json')
     
+    @_locked
     def save_config(self, config: Dict[str, Any]):
         """保存配置"""
         self._save_json('config.json', config)
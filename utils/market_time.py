@@ -1,24 +1,276 @@
 """股票市场交易时间判断工具"""
-import asyncio
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime, time as dt_time, date, timezone, timedelta
-from typing import List, Optional, Tuple, Dict, Any
+from typing import List, Optional, Tuple, Dict, Any, FrozenSet
 from astrbot.api import logger
 
+# 时区单例：全模块复用同一对象，使_convert_to_market_time的同时区判断能命中
+_UTC = timezone.utc
+_UTC8 = timezone(timedelta(hours=8))   # 北京时间（A 股、港股）
+_EST = timezone(timedelta(hours=-5))   # 东部标准时间
+_EDT = timezone(timedelta(hours=-4))   # 东部夏令时
+
+_TRADING_DAY_CACHE_MAX = 4096  # 交易日判断缓存上限（日期×市场）
+_NEXT_TRADING_DAY_SEARCH_DAYS = 14  # 向后查找下一交易日的最大天数
+
+# 需要当日为交易日的时段类型（夜盘跨天，单独判断）
+_SESSION_KINDS = ('trading_sessions', 'call_auction_sessions', 'pre_market_sessions', 'after_hours_sessions')
+
+_DAY_US = 24 * 3600 * 1_000_000  # 一天的微秒数
+
+# 可下单时段及其说明，按下单判断的优先级排列
+_ORDER_SESSION_LABELS = (
+    ('trading_sessions', '{market}市场正常交易时间'),
+    ('call_auction_sessions', '{market}市场集合竞价时间'),
+    ('pre_market_sessions', '美股盘前交易时间'),
+    ('after_hours_sessions', '美股盘后交易时间'),
+)
+_OVERNIGHT_LABEL = '美股夜盘交易时间（长桥）'
+
+# A股、港股交易日内不可下单时段的原因：(下界, 上界, 原因)，两端均不含，None表示不限
+_CLOSED_REASONS = {
+    'A': (
+        (None, dt_time(9, 15), "A股尚未到开盘时间"),
+        (dt_time(9, 25), dt_time(9, 30), "A股开盘前准备时间"),
+        (dt_time(11, 30), dt_time(13, 0), "A股午间休市时间"),
+        (dt_time(15, 0), None, "A股已过收盘时间"),
+    ),
+    'HK': (
+        (None, dt_time(9, 30), "港股尚未到开盘时间"),
+        (dt_time(12, 0), dt_time(13, 0), "港股午间休市时间"),
+        (dt_time(16, 0), None, "港股已过收盘时间"),
+    ),
+}
+
+
+# 美股浮动节假日 {年份: (MLK日, 总统日, 阵亡将士纪念日, 劳动节, 哥伦布日)}
+_US_FLOATING_HOLIDAYS = {
+    2024: (
+        date(2024, 1, 15),   # Martin Luther King Jr. Day（1月第三个周一）
+        date(2024, 2, 19),   # Presidents' Day（2月第三个周一）
+        date(2024, 5, 27),   # Memorial Day（5月最后一个周一）
+        date(2024, 9, 2),    # Labor Day（9月第一个周一）
+        date(2024, 10, 14),  # Columbus Day（10月第二个周一）
+    ),
+    2025: (
+        date(2025, 1, 20),
+        date(2025, 2, 17),
+        date(2025, 5, 26),
+        date(2025, 9, 1),
+        date(2025, 10, 13),
+    ),
+}
+
+
+@lru_cache(maxsize=8)
+def _compute_chinese_holidays(year: int) -> FrozenSet[date]:
+    """计算A股节假日集合（中国法定节假日），按年份缓存
+
+    Args:
+        year: 年份
+
+    Returns:
+        节假日集合
+    """
+    holidays = []
+
+    # 元旦
+    holidays.append(date(year, 1, 1))
+
+    # 春节假期（简化处理，实际应该根据农历计算）
+    chinese_new_year_days = [
+        # 2024年春节示例
+        date(2024, 2, 10), date(2024, 2, 11), date(2024, 2, 12),
+        date(2024, 2, 13), date(2024, 2, 14), date(2024, 2, 15), date(2024, 2, 16),
+        # 2025年春节示例（简化）
+        date(2025, 1, 29), date(2025, 1, 30), date(2025, 1, 31),
+        date(2025, 2, 1), date(2025, 2, 2), date(2025, 2, 3), date(2025, 2, 4)
+    ]
+    holidays.extend(chinese_new_year_days)
+
+    # 清明节
+    holidays.extend([
+        date(year, 4, 4), date(year, 4, 5), date(year, 4, 6)
+    ])
+
+    # 劳动节
+    holidays.extend([
+        date(year, 5, 1), date(year, 5, 2), date(year, 5, 3)
+    ])
+
+    # 端午节
+    holidays.extend([
+        date(year, 6, 10)  # 2024年端午节示例
+    ])
+
+    # 中秋节
+    holidays.extend([
+        date(year, 9, 15), date(year, 9, 16), date(year, 9, 17)  # 2024年中秋示例
+    ])
+
+    # 国庆节
+    for day in range(1, 8):  # 10月1-7日
+        holidays.append(date(year, 10, day))
+
+    return frozenset(holidays)
+
+
+@lru_cache(maxsize=8)
+def _compute_hk_holidays(year: int) -> FrozenSet[date]:
+    """计算港股节假日集合（香港公众假期），按年份缓存
+
+    Args:
+        year: 年份
+
+    Returns:
+        节假日集合
+    """
+    # 香港独有节假日
+    holidays = [
+        date(year, 4, 1),   # 复活节清明节假期
+        date(year, 4, 2),   # 复活节假期
+        date(year, 7, 1),   # 香港特别行政区成立纪念日
+        date(year, 12, 25), # 圣诞节
+        date(year, 12, 26), # 圣诞节翌日
+    ]
+
+    # 香港与内地共同的节假日直接复用已缓存的集合
+    return _compute_chinese_holidays(year) | frozenset(holidays)
+
+
+@lru_cache(maxsize=8)
+def _compute_us_holidays(year: int) -> FrozenSet[date]:
+    """计算美股节假日集合（美国联邦假日），按年份缓存
+
+    Args:
+        year: 年份
+
+    Returns:
+        节假日集合
+    """
+    holidays = []
+
+    # 美股节假日（固定日期）
+    holidays.extend([
+        date(year, 1, 1),   # New Year's Day
+        date(year, 7, 4),   # Independence Day
+        date(year, 11, 11), # Veterans Day
+        date(year, 12, 25), # Christmas Day
+    ])
+
+    # 浮动节假日（需要根据具体年份计算，这里简化为常见日期）
+    holidays.extend(_US_FLOATING_HOLIDAYS.get(year, ()))
+
+    return frozenset(holidays)
+
+
+@dataclass(slots=True)
+class MarketConfig:
+    """单个市场的交易时间配置（均为当地时间），缺省的时段为空元组"""
+    timezone: timezone
+    trading_sessions: List[Tuple[dt_time, dt_time]]
+    call_auction_sessions: Tuple[Tuple[dt_time, dt_time], ...] = ()
+    pre_market_sessions: Tuple[Tuple[dt_time, dt_time], ...] = ()
+    after_hours_sessions: Tuple[Tuple[dt_time, dt_time], ...] = ()
+    overnight_sessions: Tuple[Tuple[dt_time, dt_time], ...] = ()
+    holidays: frozenset = frozenset()
+
+
+def _time_of_day_us(t) -> int:
+    """将时间转换为当日第几微秒（整数比较比dt_time比较快得多）
+
+    精确到微秒而非秒，保证结束时刻（如11:30:00）之后的不足一秒仍判为收盘，与dt_time比较一致。
+
+    Args:
+        t: dt_time或datetime
+
+    Returns:
+        当日微秒数
+    """
+    return ((t.hour * 60 + t.minute) * 60 + t.second) * 1_000_000 + t.microsecond
+
+
+def _build_session_bounds(sessions) -> List[int]:
+    """将闭区间时段列表转换为有序边界列表（当日微秒数）
+
+    边界依次为[开始, 结束+1, 开始, 结束+1, ...]，重叠或相接的时段会合并。
+    对某一时刻t，bisect_right(bounds, t)为奇数即表示t落在某个时段内。
+
+    Args:
+        sessions: (开始时间, 结束时间)列表，两端均包含
+
+    Returns:
+        有序边界列表
+    """
+    bounds = []
+    for start_time, end_time in sorted(sessions):
+        start, after_end = _time_of_day_us(start_time), _time_of_day_us(end_time) + 1
+        if bounds and start <= bounds[-1]:
+            bounds[-1] = max(bounds[-1], after_end)
+        else:
+            bounds.extend((start, after_end))
+    return bounds
+
+
+def _build_order_bands(market: str, cfg: MarketConfig) -> Tuple[List[int], List[Tuple[tuple, str]]]:
+    """构建下单判断用的分段表
+
+    按所有时段及不可下单原因的边界把一天切分为若干段，同一段内可下单的时段和不可下单的原因都相同。
+
+    Args:
+        market: 市场类型
+        cfg: 市场配置
+
+    Returns:
+        (各段起点（当日微秒数，升序）, 各段信息[(候选时段((需为交易日的日期偏移, 说明), ...), 不可下单原因)])
+    """
+    # (开始, 结束, 需为交易日的日期偏移, 说明)，两端均包含
+    intervals = [
+        (_time_of_day_us(start_time), _time_of_day_us(end_time), 0, label.format(market=market))
+        for kind, label in _ORDER_SESSION_LABELS
+        for start_time, end_time in getattr(cfg, kind)
+    ]
+    # 夜盘上半场要求当日为交易日，下半场要求次日为交易日
+    for day_offset, (start_time, end_time) in enumerate(cfg.overnight_sessions[:2]):
+        intervals.append((_time_of_day_us(start_time), _time_of_day_us(end_time), day_offset, _OVERNIGHT_LABEL))
+
+    closed_reasons = [
+        (-1 if low is None else _time_of_day_us(low), _DAY_US if high is None else _time_of_day_us(high), reason)
+        for low, high, reason in _CLOSED_REASONS.get(market, ())
+    ]
+
+    points = {0}
+    for start, end, _, _ in intervals:
+        points.update((start, end + 1))
+    for low, high, _ in closed_reasons:
+        points.update((low + 1, high))
+    starts = sorted(point for point in points if 0 <= point < _DAY_US)
+
+    bands = []
+    for point in starts:
+        candidates = tuple((day_offset, label) for start, end, day_offset, label in intervals if start <= point <= end)
+        closed_reason = next((reason for low, high, reason in closed_reasons if low < point < high),
+                             f"{market}市场非交易时间")
+        bands.append((candidates, closed_reason))
+    return starts, bands
+
 
 class MarketTimeManager:
     """市场交易时间管理器 - 支持A股、港股、美股"""
 
     # 定义时区
-    UTC8 = timezone(timedelta(hours=8))  # 北京时间（A 股、港股）
-    UTC5 = timezone(timedelta(hours=-5))  # 美国东部时间（美股）
-    EST = timezone(timedelta(hours=-5))   # 东部标准时间
-    EDT = timezone(timedelta(hours=-4))   # 东部夏令时
+    UTC8 = _UTC8  # 北京时间（A 股、港股）
+    UTC5 = _EST   # 美国东部时间（美股）
+    EST = _EST    # 东部标准时间
+    EDT = _EDT    # 东部夏令时
 
     def __init__(self):
-        # 定义各市场的交易时间（均为当地时间）
+        # 定义各市场的交易时间（均为当地时间），节假日存为frozenset以便O(1)判断
         self.market_configs = {
             'A': {  # A股
-                'timezone': MarketTimeManager.UTC8,
+                'timezone': _UTC8,
                 'trading_sessions': [
                     (dt_time(9, 30), dt_time(11, 30)),   # 上午交易时间
                     (dt_time(13, 0), dt_time(15, 0))     # 下午交易时间
@@ -30,7 +282,7 @@ class MarketTimeManager:
                 'holidays': self._get_chinese_holidays()
             },
             'HK': {  # 港股
-                'timezone': MarketTimeManager.UTC8,
+                'timezone': _UTC8,
                 'trading_sessions': [
                     (dt_time(9, 30), dt_time(12, 0)),    # 上午交易时间
                     (dt_time(13, 0), dt_time(16, 0))     # 下午交易时间
@@ -42,7 +294,7 @@ class MarketTimeManager:
                 'holidays': self._get_hk_holidays()
             },
             'US': {  # 美股
-                'timezone': MarketTimeManager.EDT,  # 美股使用东部夏令时（3-11月）
+                'timezone': _EDT,  # 美股使用东部夏令时（3-11月）
                 'trading_sessions': [
                     (dt_time(9, 30), dt_time(16, 0))     # 正常交易时间（美东时间）
                 ],
@@ -60,122 +312,84 @@ class MarketTimeManager:
             }
         }
 
+        # 属性访问形式的市场配置，供热点路径使用
+        self._cfgs: Dict[str, MarketConfig] = {
+            market: MarketConfig(**market_config) for market, market_config in self.market_configs.items()
+        }
+
         # 默认市场为A股（保持向后兼容）
         self.default_market = 'A'
 
-    def _get_chinese_holidays(self) -> List[date]:
-        """获取A股节假日列表（中国法定节假日）"""
-        current_year = datetime.now().year
-        holidays = []
-
-        # 元旦
-        holidays.append(date(current_year, 1, 1))
-
-        # 春节假期（简化处理，实际应该根据农历计算）
-        chinese_new_year_days = [
-            # 2024年春节示例
-            date(2024, 2, 10), date(2024, 2, 11), date(2024, 2, 12),
-            date(2024, 2, 13), date(2024, 2, 14), date(2024, 2, 15), date(2024, 2, 16),
-            # 2025年春节示例（简化）
-            date(2025, 1, 29), date(2025, 1, 30), date(2025, 1, 31),
-            date(2025, 2, 1), date(2025, 2, 2), date(2025, 2, 3), date(2025, 2, 4)
-        ]
-        holidays.extend(chinese_new_year_days)
-
-        # 清明节
-        holidays.extend([
-            date(current_year, 4, 4), date(current_year, 4, 5), date(current_year, 4, 6)
-        ])
-
-        # 劳动节
-        holidays.extend([
-            date(current_year, 5, 1), date(current_year, 5, 2), date(current_year, 5, 3)
-        ])
-
-        # 端午节
-        holidays.extend([
-            date(current_year, 6, 10)  # 2024年端午节示例
-        ])
-
-        # 中秋节
-        holidays.extend([
-            date(current_year, 9, 15), date(current_year, 9, 16), date(current_year, 9, 17)  # 2024年中秋示例
-        ])
-
-        # 国庆节
-        for day in range(1, 8):  # 10月1-7日
-            holidays.append(date(current_year, 10, day))
-
-        return holidays
-
-    def _get_hk_holidays(self) -> List[date]:
-        """获取港股节假日列表（香港公众假期）"""
-        current_year = datetime.now().year
-        holidays = []
-
-        # 香港与内地共同的节假日
-        holidays.extend(self._get_chinese_holidays())
-
-        # 香港独有节假日
-        holidays.extend([
-            date(current_year, 4, 1),   # 复活节清明节假期
-            date(current_year, 4, 2),   # 复活节假期
-            date(current_year, 7, 1),   # 香港特别行政区成立纪念日
-            date(current_year, 12, 25), # 圣诞节
-            date(current_year, 12, 26), # 圣诞节翌日
-        ])
-
-        return holidays
-
-    def _get_us_holidays(self) -> List[date]:
-        """获取美股节假日列表（美国联邦假日）"""
+        # 预计算各市场各类时段的有序边界，'open'为所有需交易日时段的并集
+        self._session_bounds: Dict[str, Dict[str, List[int]]] = {}
+        # 下单判断分段表
+        self._order_bands: Dict[str, Tuple[List[int], List[Tuple[tuple, str]]]] = {}
+        # 时区显示字符串
+        self._timezone_names: Dict[str, str] = {}
+        # 各类时段的显示字符串 {市场: {时段类型: ({'start': 'HH:MM', 'end': 'HH:MM'}, ...)}}
+        self._session_strings: Dict[str, Dict[str, Tuple[Dict[str, str], ...]]] = {}
+        # 夜盘时段（当日微秒数）：[上半场, 下半场]
+        self._overnight_sessions_us: Dict[str, List[Tuple[int, int]]] = {}
+        for market, cfg in self._cfgs.items():
+            self._timezone_names[market] = str(cfg.timezone)
+            self._session_strings[market] = {
+                kind: tuple(
+                    {'start': start_time.strftime('%H:%M'), 'end': end_time.strftime('%H:%M')}
+                    for start_time, end_time in getattr(cfg, kind)
+                )
+                for kind in _SESSION_KINDS + ('overnight_sessions',)
+            }
+            self._overnight_sessions_us[market] = [
+                (_time_of_day_us(start_time), _time_of_day_us(end_time))
+                for start_time, end_time in cfg.overnight_sessions
+            ]
+            bounds = {kind: _build_session_bounds(getattr(cfg, kind)) for kind in _SESSION_KINDS}
+            bounds['open'] = _build_session_bounds(
+                [session for kind in _SESSION_KINDS for session in getattr(cfg, kind)]
+            )
+            self._session_bounds[market] = bounds
+            self._order_bands[market] = _build_order_bands(market, cfg)
+
+        # 预计算上一年至次年各市场的交易日：
+        # - 位图：第n位为1表示epoch后第n天是交易日，is_trading_day只需一次移位
+        # - 有序交易日表：供查找下一交易日时二分使用
         current_year = datetime.now().year
-        holidays = []
-
-        # 美股节假日（固定日期）
-        holidays.extend([
-            date(current_year, 1, 1),   # New Year's Day
-            date(current_year, 7, 4),   # Independence Day
-            date(current_year, 11, 11), # Veterans Day
-            date(current_year, 12, 25), # Christmas Day
-        ])
-
-        # 浮动节假日（需要根据具体年份计算，这里简化为常见日期）
-        # Martin Luther King Jr. Day（1月第三个周一）
-        if current_year == 2024:
-            holidays.append(date(2024, 1, 15))
-        elif current_year == 2025:
-            holidays.append(date(2025, 1, 20))
-
-        # Presidents' Day（2月第三个周一）
-        if current_year == 2024:
-            holidays.append(date(2024, 2, 19))
-        elif current_year == 2025:
-            holidays.append(date(2025, 2, 17))
-
-        # Memorial Day（5月最后一个周一）
-        if current_year == 2024:
-            holidays.append(date(2024, 5, 27))
-        elif current_year == 2025:
-            holidays.append(date(2025, 5, 26))
-
-        # Labor Day（9月第一个周一）
-        if current_year == 2024:
-            holidays.append(date(2024, 9, 2))
-        elif current_year == 2025:
-            holidays.append(date(2025, 9, 1))
-
-        # Columbus Day（10月第二个周一）
-        if current_year == 2024:
-            holidays.append(date(2024, 10, 14))
-        elif current_year == 2025:
-            holidays.append(date(2025, 10, 13))
-
-        return holidays
-
-    def _get_default_holidays(self) -> List[date]:
-        """
-        获取默认节假日列表（保持向后兼容）
+        first_day = date(current_year - 1, 1, 1)
+        days_count = (date(current_year + 2, 1, 1) - first_day).days
+        all_days = [first_day + timedelta(days=n) for n in range(days_count)]
+        self._trading_days_range: Tuple[date, date] = (first_day, all_days[-1])
+        self._trading_bitmap_epoch = first_day.toordinal()
+        self._trading_bitmap_days = days_count
+        self._trading_bitmaps: Dict[str, int] = {}
+        self._trading_days: Dict[str, List[date]] = {}
+        for market, cfg in self._cfgs.items():
+            bitmap = 0
+            trading_days = []
+            for offset, d in enumerate(all_days):
+                if self._is_weekday(d) and d not in cfg.holidays:
+                    bitmap |= 1 << offset
+                    trading_days.append(d)
+            self._trading_bitmaps[market] = bitmap
+            self._trading_days[market] = trading_days
+
+        # 位图范围外日期的交易日判断缓存 {(日期, 市场): 是否交易日}，节假日在初始化时已确定，结果不会变化
+        self._trading_day_cache: Dict[Tuple[date, str], bool] = {}
+
+    def _get_chinese_holidays(self) -> FrozenSet[date]:
+        """获取A股节假日集合（中国法定节假日）"""
+        return _compute_chinese_holidays(datetime.now().year)
+
+    def _get_hk_holidays(self) -> FrozenSet[date]:
+        """获取港股节假日集合（香港公众假期）"""
+        return _compute_hk_holidays(datetime.now().year)
+
+    def _get_us_holidays(self) -> FrozenSet[date]:
+        """获取美股节假日集合（美国联邦假日）"""
+        return _compute_us_holidays(datetime.now().year)
+
+    def _get_default_holidays(self) -> FrozenSet[date]:
+        """
+        获取默认节假日集合（保持向后兼容）
         简化实现，包含主要法定节假日
         实际项目中建议对接专业的节假日API
         """
@@ -196,6 +410,11 @@ class MarketTimeManager:
         if target_date is None:
             target_date = datetime.now().date()
 
+        return self._is_weekday(target_date)
+
+    @staticmethod
+    def _is_weekday(target_date: date) -> bool:
+        """判断给定日期是否为工作日（内部调用，日期已确定时跳过默认值处理）"""
         return target_date.weekday() < 5  # 0-4 是周一到周五
 
     def is_holiday(self, target_date: Optional[date] = None, market: str = None) -> bool:
@@ -215,8 +434,7 @@ class MarketTimeManager:
         if market is None:
             market = self.default_market
 
-        holidays = self.market_configs[market]['holidays']
-        return target_date in holidays
+        return target_date in self._cfgs[market].holidays
 
     def is_trading_day(self, target_date: Optional[date] = None, market: str = None) -> bool:
         """
@@ -235,7 +453,18 @@ class MarketTimeManager:
         if market is None:
             market = self.default_market
 
-        return self.is_weekday(target_date) and not self.is_holiday(target_date, market)
+        offset = target_date.toordinal() - self._trading_bitmap_epoch
+        if 0 <= offset < self._trading_bitmap_days:
+            return (self._trading_bitmaps[market] >> offset) & 1 == 1
+
+        key = (target_date, market)
+        result = self._trading_day_cache.get(key)
+        if result is None:
+            result = self._is_weekday(target_date) and target_date not in self._cfgs[market].holidays
+            if len(self._trading_day_cache) >= _TRADING_DAY_CACHE_MAX:
+                self._trading_day_cache.clear()
+            self._trading_day_cache[key] = result
+        return result
 
     def _convert_to_market_time(self, target_time: datetime, market: str) -> datetime:
         """
@@ -251,11 +480,15 @@ class MarketTimeManager:
         if market is None:
             market = self.default_market
 
-        market_timezone = self.market_configs[market]['timezone']
+        market_timezone = self._cfgs[market].timezone
+
+        # 已是目标市场时区时无需转换
+        if target_time.tzinfo is market_timezone:
+            return target_time
 
         # 如果目标时间没有时区信息，假设是UTC时间
         if target_time.tzinfo is None:
-            target_time = target_time.replace(tzinfo=timezone.utc)
+            target_time = target_time.replace(tzinfo=_UTC)
 
         # 转换为目标市场的时区
         market_time = target_time.astimezone(market_timezone)
@@ -273,7 +506,7 @@ class MarketTimeManager:
             是否在交易时间内
         """
         if target_time is None:
-            target_time = datetime.now(timezone.utc)
+            target_time = datetime.now(_UTC)
 
         if market is None:
             market = self.default_market
@@ -285,16 +518,8 @@ class MarketTimeManager:
         if not self.is_trading_day(market_time.date(), market):
             return False
 
-        market_config = self.market_configs[market]
-        trading_sessions = market_config['trading_sessions']
-        current_time = market_time.time()
-
-        # 检查是否在任一交易时间段内
-        for start_time, end_time in trading_sessions:
-            if start_time <= current_time <= end_time:
-                return True
-
-        return False
+        # 检查是否在任一交易时间段内（二分查找预计算的时段边界）
+        return bisect_right(self._session_bounds[market]['trading_sessions'], _time_of_day_us(market_time)) & 1 == 1
 
     def is_pre_market_time(self, target_time: Optional[datetime] = None, market: str = None) -> bool:
         """
@@ -308,7 +533,7 @@ class MarketTimeManager:
             是否在盘前交易时间内
         """
         if target_time is None:
-            target_time = datetime.now(timezone.utc)
+            target_time = datetime.now(_UTC)
 
         if market is None:
             market = self.default_market
@@ -324,16 +549,8 @@ class MarketTimeManager:
         if not self.is_trading_day(market_time.date(), market):
             return False
 
-        market_config = self.market_configs[market]
-        pre_market_sessions = market_config.get('pre_market_sessions', [])
-        current_time = market_time.time()
-
-        # 检查是否在盘前交易时间段内
-        for start_time, end_time in pre_market_sessions:
-            if start_time <= current_time <= end_time:
-                return True
-
-        return False
+        # 检查是否在盘前交易时间段内（二分查找预计算的时段边界）
+        return bisect_right(self._session_bounds[market]['pre_market_sessions'], _time_of_day_us(market_time)) & 1 == 1
 
     def is_after_hours_time(self, target_time: Optional[datetime] = None, market: str = None) -> bool:
         """
@@ -347,7 +564,7 @@ class MarketTimeManager:
             是否在盘后交易时间内
         """
         if target_time is None:
-            target_time = datetime.now(timezone.utc)
+            target_time = datetime.now(_UTC)
 
         if market is None:
             market = self.default_market
@@ -363,16 +580,8 @@ class MarketTimeManager:
         if not self.is_trading_day(market_time.date(), market):
             return False
 
-        market_config = self.market_configs[market]
-        after_hours_sessions = market_config.get('after_hours_sessions', [])
-        current_time = market_time.time()
-
-        # 检查是否在盘后交易时间段内
-        for start_time, end_time in after_hours_sessions:
-            if start_time <= current_time <= end_time:
-                return True
-
-        return False
+        # 检查是否在盘后交易时间段内（二分查找预计算的时段边界）
+        return bisect_right(self._session_bounds[market]['after_hours_sessions'], _time_of_day_us(market_time)) & 1 == 1
 
     def is_overnight_trading_time(self, target_time: Optional[datetime] = None, market: str = None) -> bool:
         """
@@ -386,7 +595,7 @@ class MarketTimeManager:
             是否在夜盘交易时间内
         """
         if target_time is None:
-            target_time = datetime.now(timezone.utc)
+            target_time = datetime.now(_UTC)
 
         if market is None:
             market = self.default_market
@@ -396,36 +605,34 @@ class MarketTimeManager:
             return False
 
         # 转换为美东时间
-        market_time = self._convert_to_market_time(target_time, market)
+        return self._is_overnight_market_time(self._convert_to_market_time(target_time, market), market)
 
+    def _is_overnight_market_time(self, market_time: datetime, market: str) -> bool:
+        """
+        判断已转换为市场本地时间的时刻是否在夜盘交易时间
+
+        Args:
+            market_time: 目标市场的本地时间
+            market: 市场类型
+
+        Returns:
+            是否在夜盘交易时间内
+        """
         # 检查是否为交易日（注意夜盘可能跨越两个日期）
         # 夜盘20:00-23:59属于前一个交易日，00:00-04:00属于下一个交易日
-        current_time = market_time.time()
-
-        # 获取前一交易日和后一交易日
-        prev_trading_day = market_time.date()
-        next_trading_day = date.fromordinal(market_time.date().toordinal() + 1)
-
-        # 检查前一交易日是否有效（夜盘上半场20:00-23:59）
-        if current_time >= dt_time(20, 0) and current_time <= dt_time(23, 59):
-            if self.is_trading_day(prev_trading_day, market):
-                market_config = self.market_configs[market]
-                overnight_sessions = market_config.get('overnight_sessions', [])
-                # 检查夜盘上半场
-                if len(overnight_sessions) > 0:
-                    start_time, end_time = overnight_sessions[0]  # (20:00, 23:59)
-                    if start_time <= current_time <= end_time:
-                        return True
-        # 检查下一交易日是否有效（夜盘下半场00:00-04:00）
-        elif current_time >= dt_time(0, 0) and current_time <= dt_time(4, 0):
-            if self.is_trading_day(next_trading_day, market):
-                market_config = self.market_configs[market]
-                overnight_sessions = market_config.get('overnight_sessions', [])
-                # 检查夜盘下半场
-                if len(overnight_sessions) > 1:
-                    start_time, end_time = overnight_sessions[1]  # (00:00, 04:00)
-                    if start_time <= current_time <= end_time:
-                        return True
+        current_us = _time_of_day_us(market_time)
+        overnight_sessions = self._overnight_sessions_us.get(market, ())
+
+        # 夜盘上半场(20:00-23:59)：当日须为交易日
+        if len(overnight_sessions) > 0:
+            start_us, end_us = overnight_sessions[0]
+            if start_us <= current_us <= end_us:
+                return self.is_trading_day(market_time.date(), market)
+        # 夜盘下半场(00:00-04:00)：次日须为交易日
+        if len(overnight_sessions) > 1:
+            start_us, end_us = overnight_sessions[1]
+            if start_us <= current_us <= end_us:
+                return self.is_trading_day(market_time.date() + timedelta(days=1), market)
 
         return False
 
@@ -441,7 +648,7 @@ class MarketTimeManager:
             是否在集合竞价时间内
         """
         if target_time is None:
-            target_time = datetime.now(timezone.utc)
+            target_time = datetime.now(_UTC)
 
         if market is None:
             market = self.default_market
@@ -453,16 +660,8 @@ class MarketTimeManager:
         if not self.is_trading_day(market_time.date(), market):
             return False
 
-        market_config = self.market_configs[market]
-        call_auction_sessions = market_config.get('call_auction_sessions', [])
-        current_time = market_time.time()
-
-        # 检查是否在任一集合竞价时间段内
-        for start_time, end_time in call_auction_sessions:
-            if start_time <= current_time <= end_time:
-                return True
-
-        return False
+        # 检查是否在任一集合竞价时间段内（二分查找预计算的时段边界）
+        return bisect_right(self._session_bounds[market]['call_auction_sessions'], _time_of_day_us(market_time)) & 1 == 1
 
     def is_market_open(self, target_time: Optional[datetime] = None, market: str = None) -> bool:
         """
@@ -476,30 +675,22 @@ class MarketTimeManager:
             市场是否开放
         """
         if target_time is None:
-            target_time = datetime.now(timezone.utc)
+            target_time = datetime.now(_UTC)
 
         if market is None:
             market = self.default_market
 
-        # 基本交易时间
-        if self.is_trading_time(target_time, market):
-            return True
+        # 只做一次时区转换和交易日判断
+        market_time = self._convert_to_market_time(target_time, market)
 
-        # 集合竞价时间（A股、港股）
-        if self.is_call_auction_time(target_time, market):
+        # 正常交易、集合竞价（A股、港股）、盘前盘后（美股）时段均要求当日为交易日
+        if (self.is_trading_day(market_time.date(), market)
+                and bisect_right(self._session_bounds[market]['open'], _time_of_day_us(market_time)) & 1):
             return True
 
-        # 美股的特殊交易时段
+        # 夜盘交易（长桥专有，按前后交易日单独判断）
         if market == 'US':
-            # 盘前交易
-            if self.is_pre_market_time(target_time, market):
-                return True
-            # 盘后交易
-            if self.is_after_hours_time(target_time, market):
-                return True
-            # 夜盘交易（长桥专有）
-            if self.is_overnight_trading_time(target_time, market):
-                return True
+            return self._is_overnight_market_time(market_time, market)
 
         return False
 
@@ -515,13 +706,13 @@ class MarketTimeManager:
             下一个交易时间点或None
         """
         if from_time is None:
-            from_time = datetime.now(timezone.utc)
+            from_time = datetime.now(_UTC)
 
         if market is None:
             market = self.default_market
 
-        market_timezone = self.market_configs[market]['timezone']
-        market_config = self.market_configs[market]
+        cfg = self._cfgs[market]
+        market_timezone = cfg.timezone
 
         # 转换为目标市场的时间
         from_market_time = self._convert_to_market_time(from_time, market)
@@ -530,20 +721,46 @@ class MarketTimeManager:
 
         # 如果是交易日
         if self.is_trading_day(current_date, market):
-            trading_sessions = market_config['trading_sessions']
             # 检查今日剩余的交易时间段
-            for start_time, _ in trading_sessions:
+            for start_time, _ in cfg.trading_sessions:
                 if current_time < start_time:
                     # 返回目标市场的开盘时间
-                    return datetime.combine(current_date, start_time).replace(tzinfo=market_timezone)
+                    return datetime(current_date.year, current_date.month, current_date.day,
+                                    start_time.hour, start_time.minute, start_time.second, tzinfo=market_timezone)
 
         # 寻找下一个交易日的开盘时间
-        for i in range(1, 15):  # 最多向前查找15天
-            next_date = date.fromordinal(current_date.toordinal() + i)
-            if self.is_trading_day(next_date, market):
-                next_market_time = datetime.combine(next_date, market_config['trading_sessions'][0][0])
-                return next_market_time.replace(tzinfo=market_timezone)
+        next_date = self._find_next_trading_date(current_date, market)
+        if next_date is None:
+            return None
+        open_time = cfg.trading_sessions[0][0]
+        return datetime(next_date.year, next_date.month, next_date.day,
+                        open_time.hour, open_time.minute, open_time.second, tzinfo=market_timezone)
+
+    def _find_next_trading_date(self, current_date: date, market: str) -> Optional[date]:
+        """
+        查找指定日期之后的下一个交易日（最多向后查找14天）
+
+        Args:
+            current_date: 起始日期（不含）
+            market: 市场类型
 
+        Returns:
+            下一个交易日，查找范围内没有则为None
+        """
+        first_day, last_day = self._trading_days_range
+        if first_day <= current_date and current_date + timedelta(days=_NEXT_TRADING_DAY_SEARCH_DAYS) <= last_day:
+            # 查找范围完全落在预计算表内，二分查找
+            trading_days = self._trading_days[market]
+            idx = bisect_right(trading_days, current_date)
+            if idx < len(trading_days) and (trading_days[idx] - current_date).days <= _NEXT_TRADING_DAY_SEARCH_DAYS:
+                return trading_days[idx]
+            return None
+
+        # 超出预计算范围时逐日查找
+        for i in range(1, _NEXT_TRADING_DAY_SEARCH_DAYS + 1):
+            next_date = current_date + timedelta(days=i)
+            if self.is_trading_day(next_date, market):
+                return next_date
         return None
 
     def get_trading_sessions_info(self, target_date: Optional[date] = None, market: str = None) -> Dict[str, Any]:
@@ -563,66 +780,28 @@ class MarketTimeManager:
         if market is None:
             market = self.default_market
 
-        market_config = self.market_configs[market]
-        trading_sessions = market_config['trading_sessions']
-        call_auction_sessions = market_config.get('call_auction_sessions', [])
-        pre_market_sessions = market_config.get('pre_market_sessions', [])
-        after_hours_sessions = market_config.get('after_hours_sessions', [])
+        # 时段字符串在初始化时已格式化，这里只复制列表
+        session_strings = self._session_strings[market]
 
         result = {
             'date': target_date,
             'market': market,
-            'timezone': str(market_config['timezone']),
+            'timezone': self._timezone_names[market],
             'is_trading_day': self.is_trading_day(target_date, market),
-            'is_weekday': self.is_weekday(target_date),
+            'is_weekday': self._is_weekday(target_date),
             'is_holiday': self.is_holiday(target_date, market),
-            'trading_sessions': [
-                {
-                    'start': session[0].strftime('%H:%M'),
-                    'end': session[1].strftime('%H:%M')
-                }
-                for session in trading_sessions
-            ]
+            'trading_sessions': list(session_strings['trading_sessions'])
         }
 
         # 添加集合竞价时间（A股、港股）
-        if call_auction_sessions:
-            result['call_auction_sessions'] = [
-                {
-                    'start': session[0].strftime('%H:%M'),
-                    'end': session[1].strftime('%H:%M')
-                }
-                for session in call_auction_sessions
-            ]
+        if session_strings['call_auction_sessions']:
+            result['call_auction_sessions'] = list(session_strings['call_auction_sessions'])
 
-        # 添加美股特殊时段
+        # 添加美股特殊时段（含长桥专有的夜盘交易时段）
         if market == 'US':
-            if pre_market_sessions:
-                result['pre_market_sessions'] = [
-                    {
-                        'start': session[0].strftime('%H:%M'),
-                        'end': session[1].strftime('%H:%M')
-                    }
-                    for session in pre_market_sessions
-                ]
-            if after_hours_sessions:
-                result['after_hours_sessions'] = [
-                    {
-                        'start': session[0].strftime('%H:%M'),
-                        'end': session[1].strftime('%H:%M')
-                    }
-                    for session in after_hours_sessions
-                ]
-            # 添加夜盘交易时段（长桥专有）
-            overnight_sessions = market_config.get('overnight_sessions', [])
-            if overnight_sessions:
-                result['overnight_sessions'] = [
-                    {
-                        'start': session[0].strftime('%H:%M'),
-                        'end': session[1].strftime('%H:%M')
-                    }
-                    for session in overnight_sessions
-                ]
+            for kind in ('pre_market_sessions', 'after_hours_sessions', 'overnight_sessions'):
+                if session_strings[kind]:
+                    result[kind] = list(session_strings[kind])
 
         return result
     
@@ -638,89 +817,66 @@ class MarketTimeManager:
             (是否可以下单, 原因说明)
         """
         if target_time is None:
-            target_time = datetime.now(timezone.utc)
+            target_time = datetime.now(_UTC)
 
         if market is None:
             market = self.default_market
 
         logger.info(f"[can_place_order] 市场: {market}, UTC时间: {target_time}")
 
-        # 转换为目标市场的本地时间
+        # 转换为目标市场的本地时间后统一判断
         market_time = self._convert_to_market_time(target_time, market)
-        logger.info(f"[can_place_order] {market}市场本地时间: {market_time}")
+        can_order, reason = self._classify(market_time, market)
 
-        # 检查是否为交易日
-        if not self.is_trading_day(market_time.date(), market):
-            if not self.is_weekday(market_time.date()):
-                logger.warning(f"[can_place_order] {market}市场今日为周末")
+        log = logger.info if can_order else logger.warning
+        log(f"[can_place_order] {market}市场本地时间: {market_time}, 可下单: {can_order}, {reason}")
+        return can_order, reason
+
+    def is_order_time(self, target_time: Optional[datetime] = None, market: str = None) -> bool:
+        """
+        判断是否可以下单（与can_place_order结论一致，但不记录日志，供行情缓存等高频路径使用）
+
+        Args:
+            target_time: 目标时间，默认为当前时间（UTC时间）
+            market: 市场类型（'A', 'HK', 'US'），默认为A股
+
+        Returns:
+            是否可以下单
+        """
+        if target_time is None:
+            target_time = datetime.now(_UTC)
+
+        if market is None:
+            market = self.default_market
+
+        return self._classify(self._convert_to_market_time(target_time, market), market)[0]
+
+    def _classify(self, market_time: datetime, market: str) -> Tuple[bool, str]:
+        """
+        判断市场本地时间能否下单
+
+        只做一次交易日判断，再二分查找预计算的分段表，直接得到可下单时段或不可下单原因
+
+        Args:
+            market_time: 目标市场的本地时间
+            market: 市场类型
+
+        Returns:
+            (是否可以下单, 原因说明)
+        """
+        current_date = market_time.date()
+        if not self.is_trading_day(current_date, market):
+            if not self._is_weekday(current_date):
                 return False, f"{market}市场今日为周末，不可交易"
-            else:
-                logger.warning(f"[can_place_order] {market}市场今日为法定节假日")
-                return False, f"{market}市场今日为法定节假日，不可交易"
-
-        # 检查具体时间
-        market_config = self.market_configs[market]
-        current_time = market_time.time()
-        logger.info(f"[can_place_order] {market}市场当前时间: {current_time}")
-
-        # 基本交易时间
-        is_regular_trading = self.is_trading_time(target_time, market)
-        is_call_auction = self.is_call_auction_time(target_time, market)
-        logger.info(f"[can_place_order] 是否正常交易时间: {is_regular_trading}, 是否集合竞价: {is_call_auction}")
-
-        if is_regular_trading:
-            logger.info(f"[can_place_order] {market}市场正常交易时间，允许下单")
-            return True, f"{market}市场正常交易时间"
-        elif is_call_auction:
-            logger.info(f"[can_place_order] {market}市场集合竞价时间，允许下单")
-            return True, f"{market}市场集合竞价时间"
-
-        # 美股特殊时段检查（包含夜盘）
-        if market == 'US':
-            is_pre_market = self.is_pre_market_time(target_time, market)
-            is_after_hours = self.is_after_hours_time(target_time, market)
-            is_overnight = self.is_overnight_trading_time(target_time, market)
-            logger.info(f"[can_place_order] 美股特殊时段 - 盘前: {is_pre_market}, 盘后: {is_after_hours}, 夜盘: {is_overnight}")
-
-            if is_pre_market:
-                logger.info("[can_place_order] 美股盘前交易时间，允许下单")
-                return True, "美股盘前交易时间"
-            elif is_after_hours:
-                logger.info("[can_place_order] 美股盘后交易时间，允许下单")
-                return True, "美股盘后交易时间"
-            elif is_overnight:
-                logger.info("[can_place_order] 美股夜盘交易时间，允许下单")
-                return True, "美股夜盘交易时间（长桥）"
-
-        # A股和港股的时间段判断
-        if market in ['A', 'HK']:
-            # 根据各市场的具体时间安排判断
-            if market == 'A':
-                if current_time < dt_time(9, 15):
-                    logger.warning(f"[can_place_order] A股尚未到开盘时间: {current_time}")
-                    return False, "A股尚未到开盘时间"
-                elif dt_time(9, 25) < current_time < dt_time(9, 30):
-                    logger.warning(f"[can_place_order] A股开盘前准备时间: {current_time}")
-                    return False, "A股开盘前准备时间"
-                elif dt_time(11, 30) < current_time < dt_time(13, 0):
-                    logger.warning(f"[can_place_order] A股午间休市时间: {current_time}")
-                    return False, "A股午间休市时间"
-                elif current_time > dt_time(15, 0):
-                    logger.warning(f"[can_place_order] A股已过收盘时间: {current_time}")
-                    return False, "A股已过收盘时间"
-            elif market == 'HK':
-                if current_time < dt_time(9, 30):
-                    logger.warning(f"[can_place_order] 港股尚未到开盘时间: {current_time}")
-                    return False, "港股尚未到开盘时间"
-                elif dt_time(12, 0) < current_time < dt_time(13, 0):
-                    logger.warning(f"[can_place_order] 港股午间休市时间: {current_time}")
-                    return False, "港股午间休市时间"
-                elif current_time > dt_time(16, 0):
-                    logger.warning(f"[can_place_order] 港股已过收盘时间: {current_time}")
-                    return False, "港股已过收盘时间"
-
-        logger.warning(f"[can_place_order] {market}市场非交易时间，当前时间: {current_time}")
-        return False, f"{market}市场非交易时间"
+            return False, f"{market}市场今日为法定节假日，不可交易"
+
+        starts, bands = self._order_bands[market]
+        candidates, closed_reason = bands[bisect_right(starts, _time_of_day_us(market_time)) - 1]
+        for day_offset, label in candidates:
+            # 夜盘下半场还要求次日为交易日
+            if not day_offset or self.is_trading_day(current_date + timedelta(days=day_offset), market):
+                return True, label
+        return False, closed_reason
 
 
 # 全局市场时间管理器实例
@@ -825,6 +981,20 @@ def can_place_order(target_time: Optional[datetime] = None, market: str = None)
     return market_time_manager.can_place_order(target_time, market)
 
 
+def is_order_time(target_time: Optional[datetime] = None, market: str = None) -> bool:
+    """
+    便捷函数：判断是否可以下单（不记录日志）
+
+    Args:
+        target_time: 目标时间，默认为当前时间（UTC时间）
+        market: 市场类型（'A', 'HK', 'US'），默认为A股
+
+    Returns:
+        是否可以下单
+    """
+    return market_time_manager.is_order_time(target_time, market)
+
+
 def get_next_trading_time(from_time: Optional[datetime] = None, market: str = None) -> Optional[datetime]:
     """
     便捷函数：获取下一个交易时间点
@@ -66,7 +66,8 @@ class PriceCalculator:
         return StockType.NORMAL
     
     async def calculate_price_limits(self, stock_code: str, stock_name: str, 
-                                   current_time: Optional[datetime] = None) -> Dict[str, float]:
+                                   current_time: Optional[datetime] = None, api=None,
+                                   base_price: Optional[float] = None) -> Dict[str, float]:
         """
         基于收盘价本地计算涨跌停价格
         
@@ -74,6 +75,8 @@ class PriceCalculator:
             stock_code: 股票代码
             stock_name: 股票名称  
             current_time: 当前时间，默认为系统当前时间（用于获取正确的基准价格）
+            api: 调用方已打开的东方财富API实例，需要重新获取基准价时复用其会话
+            base_price: 调用方已持有行情时直接传入基准价，不再重复请求
             
         Returns:
             包含limit_up和limit_down的字典
@@ -81,8 +84,9 @@ class PriceCalculator:
         if current_time is None:
             current_time = datetime.now()
         
-        # 获取基准价格（通常是最近的收盘价）
-        base_price = await self._get_base_close_price(stock_code)
+        # 获取基准价格（通常是最近的收盘价），调用方未提供时才请求行情
+        if not base_price or base_price <= 0:
+            base_price = await self._get_base_close_price(stock_code, api)
         if base_price is None or base_price <= 0:
             logger.error(f"无法获取股票 {stock_code} 的基准收盘价")
             return {'limit_up': 0, 'limit_down': 0}
@@ -115,7 +119,7 @@ class PriceCalculator:
             'limit_ratio': limit_ratio
         }
     
-    async def _get_base_close_price(self, stock_code: str) -> Optional[float]:
+    async def _get_base_close_price(self, stock_code: str, api=None) -> Optional[float]:
         """
         获取基准收盘价（用于本地涨跌停计算）
         
@@ -124,17 +128,32 @@ class PriceCalculator:
         
         Args:
             stock_code: 股票代码
+            api: 调用方已打开的东方财富API实例，传入时复用其会话
             
         Returns:
             基准收盘价
         """
         try:
+            if api is not None:
+                # 复用调用方的API会话直接获取原始行情，不再新建服务和会话
+                raw_data = await api.get_stock_realtime_data(stock_code)
+                if raw_data:
+                    base_price = raw_data.get('current_price', 0) or raw_data.get('close_price', 0)
+                    if base_price > 0:
+                        logger.debug(f"股票 {stock_code} 基准收盘价: {base_price}")
+                        return base_price
+                logger.warning(f"无法获取股票 {stock_code} 的收盘价")
+                return None
+
             from ..services.stock_data import StockDataService
             stock_service = StockDataService(self.storage) if self.storage else None
             
             if stock_service:
                 # 获取股票信息，跳过涨跌停计算（防止递归调用）
-                stock_info = await stock_service.get_stock_info(stock_code, skip_limit_calculation=True)
+                try:
+                    stock_info = await stock_service.get_stock_info(stock_code, skip_limit_calculation=True)
+                finally:
+                    await stock_service.close()
                 if stock_info:
                     # 优先使用current_price作为基准价格（在非交易时间，这就是最近交易日的收盘价）
                     if hasattr(stock_info, 'current_price') and stock_info.current_price > 0:
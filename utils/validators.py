@@ -1,189 +1,246 @@
 """数据验证工具"""
 import re
-from typing import Optional
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Iterable, List, Optional, Sequence
+
+# A股股票代码格式: 6位数字
+# 上海A股: 60xxxx, 68xxxx
+# 深圳A股: 00xxxx, 30xxxx (创业板)
+# 北交所: 43xxxx, 83xxxx, 87xxxx
+_A_PREFIXES = frozenset({'00', '30', '60', '68', '43', '83', '87'})
+
+# 指数代码（不允许交易指数）
+_INDEX_CODES = frozenset({
+    '399001',  # 深证成指
+    '399005',  # 中小100/中小板
+    '399006',  # 创业板指
+})
+
+# A股代码前缀 -> 交易所前缀（akshare格式）
+_EXCHANGE_PREFIX = MappingProxyType({
+    '60': 'sh', '68': 'sh',              # 上海证券交易所
+    '00': 'sz', '30': 'sz',              # 深圳证券交易所
+    '43': 'bj', '83': 'bj', '87': 'bj',  # 北京证券交易所
+})
+
+def _is_a_stock_code(code: str) -> bool:
+    """判断是否为A股代码格式（2位前缀 + 4位ASCII数字，不含指数排除）"""
+    return len(code) == 6 and code[:2] in _A_PREFIXES and code.isascii() and code[2:].isdigit()
+
+
+# 全部支持格式合并为一个正则（对去空格、转大写后的代码做fullmatch）
+_A_ALT = '|'.join(sorted(_A_PREFIXES))
+_STOCK_CODE_RE = re.compile(
+    rf'(?:{_A_ALT})[0-9]{{4}}(?:\.A)?'          # A股: 6位数字，可带.A后缀
+    r'|[0-9]{4,5}(?:\.HK)?'                     # 港股: 4-5位数字，可带.HK后缀
+    r'|[A-Z]{1,5}'                              # 美股: 1-5个字母
+    r'|[A-Z]{1,5}(?:\.(?!HK\.|US\.)[A-Z]{1,2})?\.US'  # 美股带.US后缀，可带股份类别如BRK.B.US（类别不能是HK/US）
+)
+
+
+@lru_cache(maxsize=4096)
+def _is_valid_stock_code_cached(code: str) -> bool:
+    """验证股票代码格式（纯函数，结果按代码缓存）"""
+    # 去除前后空格并转换为大写（非str输入在此抛出TypeError）
+    # A股、港股代码为纯数字，无需转换大小写
+    code = str.strip(code)
+    if not code.isdigit():
+        code = code.upper()
+
+    # 排除指数代码（不允许交易指数）
+    return _STOCK_CODE_RE.fullmatch(code) is not None and code not in _INDEX_CODES
+
+
+@lru_cache(maxsize=8192)
+def _normalize_stock_code_cached(code: str) -> Optional[str]:
+    """标准化股票代码（纯函数，结果按代码缓存）"""
+    code = str.strip(code)
+    if not code.isdigit():
+        code = code.upper()
+
+    # 只对A股进行标准化（因为A股的验证规则更严格）
+    if _is_a_stock_code(code):
+        # 排除指数代码
+        if code in _INDEX_CODES:
+            return None
+        # A股代码集合有限，驻留后下游以代码为键的字典查找可走指针比较
+        return sys.intern(code)
 
+    # 港股和美股在StockDataService中处理标准化
+    return code
 
-class Validators:
-    """数据验证器"""
-
-    @staticmethod
-    def is_valid_stock_code(code: str) -> bool:
-        """验证股票代码格式（支持A股、港股、美股）"""
-        if not code or not isinstance(code, str):
-            return False
-
-        # 去除前后空格并转换为大写
-        code = code.strip().upper()
-
-        # 检查是否已经是完整格式（带市场后缀）
-        if '.HK' in code or '.US' in code or '.A' in code:
-            # 完整格式验证
-            if '.HK' in code:
-                # 港股: 数字.HK
-                base_code = code.split('.')[0]
-                return len(base_code) >= 4 and len(base_code) <= 5 and base_code.isdigit()
-            elif '.US' in code:
-                # 美股: 字母.US
-                base_code = code.split('.')[0]
-                return 1 <= len(base_code) <= 5 and base_code.replace('.', '').isalpha()
-            elif '.A' in code:
-                # A股: 数字.A
-                base_code = code.split('.')[0]
-                return re.match(r'^(00|30|60|68|43|83|87)\d{4}$', base_code)
-
-        # A股股票代码格式: 6位数字
-        # 上海A股: 60xxxx, 68xxxx
-        # 深圳A股: 00xxxx, 30xxxx (创业板)
-        # 北交所: 43xxxx, 83xxxx, 87xxxx
-        a_stock_pattern = r'^(00|30|60|68|43|83|87)\d{4}$'
-        if re.match(a_stock_pattern, code):
-            # 排除指数代码（不允许交易指数）
-            index_codes = {
-                '399001',  # 深证成指
-                '399005',  # 中小100/中小板
-                '399006',  # 创业板指
-            }
-            return code not in index_codes
-
-        # 港股：通常4-5位数字
-        if code.isdigit() and 4 <= len(code) <= 5:
-            return True
-
-        # 美股：1-5个大写字母
-        if code.isalpha() and 1 <= len(code) <= 5:
-            return True
 
+@lru_cache(maxsize=8192)
+def _format_stock_code_with_exchange_cached(code: str) -> Optional[str]:
+    """为股票代码添加交易所前缀（纯函数，结果按代码缓存，命中时直接返回已拼接的字符串）"""
+    code = _normalize_stock_code_cached(code)
+    if not code:
+        return None
+
+    # 根据代码前两位查表判断交易所
+    exchange = _EXCHANGE_PREFIX.get(code[:2])
+    return f'{exchange}{code}' if exchange else None
+
+
+@dataclass(slots=True)
+class OrderParams:
+    """订单参数解析结果"""
+    stock_code: Optional[str] = None    # 标准化后的股票代码
+    volume: Optional[int] = None        # 交易数量
+    price: Optional[float] = None       # 委托价格（市价单为None）
+    is_market_order: bool = True        # 是否市价单
+    error: Optional[str] = None         # 解析失败时的错误信息
+
+
+def _err(msg: str, stock_code: Optional[str] = None, volume: Optional[int] = None) -> OrderParams:
+    """构造解析失败的结果（保留出错前已解析的字段）"""
+    return OrderParams(stock_code=stock_code, volume=volume, error=msg)
+
+
+def is_valid_stock_code(code: str) -> bool:
+    """验证股票代码格式（支持A股、港股、美股）"""
+    # 绝大多数调用传入的都是字符串，非字符串由异常兜底，省去每次的类型检查
+    try:
+        return bool(code) and _is_valid_stock_code_cached(code)
+    except TypeError:
         return False
-    
-    @staticmethod
-    def normalize_stock_code(code: str) -> Optional[str]:
-        """标准化股票代码（仅对A股有效）"""
-        if not code or not isinstance(code, str):
-            return None
 
-        code = code.strip().upper()
-
-        # 只对A股进行标准化（因为A股的验证规则更严格）
-        a_stock_pattern = r'^(00|30|60|68|43|83|87)\d{4}$'
-        if re.match(a_stock_pattern, code):
-            # 排除指数代码
-            index_codes = {'399001', '399005', '399006'}
-            if code in index_codes:
-                return None
-            return code
-
-        # 港股和美股在StockDataService中处理标准化
-        return code
-    
-    @staticmethod
-    def is_valid_price(price: float) -> bool:
-        """验证价格是否有效"""
-        return price > 0 and price < 10000  # 假设股价不会超过10000元
-    
-    @staticmethod
-    def is_valid_volume(volume: int, market: str = 'A') -> bool:
-        """验证交易数量是否有效
-
-        Args:
-            volume: 交易数量
-            market: 市场类型 ('A'=A股, 'HK'=港股, 'US'=美股)
-
-        Returns:
-            是否有效
-
-        规则:
-            - A股: 必须是100的倍数(1手=100股)
-            - 港股: 必须是100的倍数(1手=100股)
-            - 美股: 无整手限制,任意正整数即可
-        """
-        if volume <= 0:
-            return False
-
-        # 美股没有整手限制
-        if market == 'US':
-            return True
-
-        # A股和港股必须是100的倍数
-        return volume % 100 == 0
-    
-    @staticmethod
-    def is_valid_amount(amount: float) -> bool:
-        """验证交易金额是否有效"""
-        return amount > 0 and amount < 100000000  # 不超过1亿
-    
-    @staticmethod
-    def is_valid_user_id(user_id: str) -> bool:
-        """验证用户ID格式"""
-        return bool(user_id and isinstance(user_id, str) and len(user_id.strip()) > 0)
-    
-    @staticmethod
-    def format_stock_code_with_exchange(code: str) -> Optional[str]:
-        """为股票代码添加交易所前缀（akshare需要）"""
-        code = Validators.normalize_stock_code(code)
-        if not code:
-            return None
-        
-        # 根据代码判断交易所
-        if code.startswith(('60', '68')):
-            return f'sh{code}'  # 上海证券交易所
-        elif code.startswith(('00', '30')):
-            return f'sz{code}'  # 深圳证券交易所
-        elif code.startswith(('43', '83', '87')):
-            return f'bj{code}'  # 北京证券交易所
-        else:
-            return None
-    
-    @staticmethod
-    def parse_order_params(params: list) -> dict:
-        """解析订单参数"""
-        result = {
-            'stock_code': None,
-            'volume': None,
-            'price': None,
-            'is_market_order': True,
-            'error': None
-        }
-        
-        if len(params) < 2:
-            result['error'] = "参数不足，至少需要股票代码和数量"
-            return result
-        
-        # 解析股票代码
-        stock_code = Validators.normalize_stock_code(params[0])
-        if not stock_code:
-            result['error'] = f"无效的股票代码: {params[0]}"
-            return result
-        result['stock_code'] = stock_code
-        
-        # 解析数量
-        try:
-            volume = int(params[1])
-            # 先只验证是否为正整数,市场特定规则需要在知道市场类型后验证
-            if volume <= 0:
-                result['error'] = f"无效的交易数量: {volume}，必须是正整数"
-                return result
-            result['volume'] = volume
-        except ValueError:
-            result['error'] = f"无效的数量格式: {params[1]}"
-            return result
-        
-        # 解析价格（可选）
-        if len(params) >= 3:
-            try:
-                price = float(params[2])
-                if not Validators.is_valid_price(price):
-                    result['error'] = f"无效的价格: {price}"
-                    return result
-                result['price'] = price
-                result['is_market_order'] = False
-            except ValueError:
-                result['error'] = f"无效的价格格式: {params[2]}"
-                return result
-        
-        return result
-    
-    @staticmethod
-    def validate_order_amount(volume: int, price: float, min_amount: float = 100) -> bool:
-        """验证订单金额是否满足最小要求"""
-        total_amount = volume * price
-        return total_amount >= min_amount
+
+def normalize_stock_code(code: str) -> Optional[str]:
+    """标准化股票代码（仅对A股有效）"""
+    if not code:
+        return None
+    try:
+        return _normalize_stock_code_cached(code)
+    except TypeError:
+        return None
+
+
+def is_valid_price(price: float) -> bool:
+    """验证价格是否有效"""
+    # 链式比较：NaN与任何数比较均为False，inf超出上限，均被拒绝
+    return 0 < price < 10000  # 假设股价不会超过10000元
+
+
+def is_valid_volume(volume: int, market: str = 'A') -> bool:
+    """验证交易数量是否有效
+
+    Args:
+        volume: 交易数量
+        market: 市场类型 ('A'=A股, 'HK'=港股, 'US'=美股)
+
+    Returns:
+        是否有效
+
+    规则:
+        - A股: 必须是100的倍数(1手=100股)
+        - 港股: 必须是100的倍数(1手=100股)
+        - 美股: 无整手限制,任意正整数即可
+    """
+    # 非整数及非正数先行拒绝，不做取模运算
+    if not isinstance(volume, int) or volume <= 0:
+        return False
+
+    # 美股没有整手限制；A股和港股必须是100的倍数
+    return market == 'US' or volume % 100 == 0
+
+
+def is_valid_amount(amount: float) -> bool:
+    """验证交易金额是否有效"""
+    return 0 < amount < 100_000_000  # 不超过1亿
+
+
+def is_valid_user_id(user_id: str) -> bool:
+    """验证用户ID格式"""
+    if not isinstance(user_id, str):
+        return False
+    # isspace()不分配新字符串；空串的isspace()为False，需单独判断
+    return user_id != '' and not user_id.isspace()
+
+
+def format_stock_code_with_exchange(code: str) -> Optional[str]:
+    """为股票代码添加交易所前缀（akshare需要）"""
+    if not code:
+        return None
+    try:
+        return _format_stock_code_with_exchange_cached(code)
+    except TypeError:
+        return None
+
+
+def parse_order_params(params: list) -> OrderParams:
+    """解析订单参数"""
+    n = len(params)
+    if n < 2:
+        return _err("参数不足，至少需要股票代码和数量")
+    if n == 2:
+        raw_code, raw_volume = params
+        raw_price = None
+    else:
+        raw_code, raw_volume, raw_price = params[:3]
+
+    # 解析股票代码
+    stock_code = normalize_stock_code(raw_code)
+    if not stock_code:
+        return _err(f"无效的股票代码: {raw_code}")
+
+    # 解析数量
+    try:
+        volume = int(raw_volume)
+    except ValueError:
+        return _err(f"无效的数量格式: {raw_volume}", stock_code)
+    # 先只验证是否为正整数,市场特定规则需要在知道市场类型后验证
+    if volume <= 0:
+        return _err(f"无效的交易数量: {volume}，必须是正整数", stock_code)
+
+    # 解析价格（可选）
+    if raw_price is None:
+        return OrderParams(stock_code=stock_code, volume=volume)
+    try:
+        price = float(raw_price)
+    except ValueError:
+        return _err(f"无效的价格格式: {raw_price}", stock_code, volume)
+    if not is_valid_price(price):
+        return _err(f"无效的价格: {price}", stock_code, volume)
+
+    return OrderParams(stock_code=stock_code, volume=volume, price=price, is_market_order=False)
+
+
+def parse_order_params_batch(params_list: Iterable[Sequence]) -> List[OrderParams]:
+    """批量解析订单参数（如组合调仓时一次提交多笔订单）
+
+    股票代码标准化结果按代码缓存，同一批次中重复出现的代码只计算一次。
+    单笔解析失败不影响其他订单，错误记录在对应结果的error字段中。
+
+    Args:
+        params_list: 多笔订单的参数列表，每项格式同parse_order_params
+
+    Returns:
+        与输入顺序一一对应的解析结果列表
+    """
+    parse = parse_order_params
+    return [parse(params) for params in params_list]
+
+
+def validate_order_amount(volume: int, price: float, min_amount: float = 100) -> bool:
+    """验证订单金额是否满足最小要求"""
+    total_amount = volume * price
+    return total_amount >= min_amount
+
+
+class Validators:
+    """数据验证器（保留原有调用方式，各方法直接引用模块级函数）"""
+
+    is_valid_stock_code = staticmethod(is_valid_stock_code)
+    normalize_stock_code = staticmethod(normalize_stock_code)
+    is_valid_price = staticmethod(is_valid_price)
+    is_valid_volume = staticmethod(is_valid_volume)
+    is_valid_amount = staticmethod(is_valid_amount)
+    is_valid_user_id = staticmethod(is_valid_user_id)
+    format_stock_code_with_exchange = staticmethod(format_stock_code_with_exchange)
+    parse_order_params = staticmethod(parse_order_params)
+    parse_order_params_batch = staticmethod(parse_order_params_batch)
+    validate_order_amount = staticmethod(validate_order_amount)